@@ -0,0 +1,25 @@
+"""Crash-safe file replacement for the state files under data/."""
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w"):
+    """Write to a temp file beside path and move it into place on success.
+
+    Readers see either the old file or the complete new one, never a partial
+    write. Parent directories are created as needed; on error the temp file
+    is removed and path is left untouched.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,187 @@
+"""Microbenchmarks for the CPU-bound pipeline stages, with stored baselines.
+
+    python -m src.bench                  # compare against benchmarks/baselines.json
+    python -m src.bench --save           # record new baselines
+    python -m src.bench -k blocklist --scales 10 100
+
+Each benchmark runs on synthetic markets at 10x, 100x and 1000x the input a
+daily run feeds it. Baselines are machine-specific: record them on the
+machine you compare on.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+from dataclasses import dataclass
+from typing import Callable
+
+from src.blocklist import is_blocklisted
+from src.email_template import render_newsletter
+from src.polymarket import CATEGORY_TAGS
+from src.ranker import filter_markets, select_top_markets
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "baselines.json")
+SCALES = (10, 100, 1000)
+REGRESSION_THRESHOLD = 1.5  # Flag when per-call time exceeds baseline by this factor
+REPEAT = 3
+
+# Markets per daily run at 1x: 20 events per category fetched, up to 50
+# classified candidates ranked, 10 selected markets rendered
+BASE_SIZES = {
+    "filter_markets": 20 * len(CATEGORY_TAGS),
+    "is_blocklisted": 20 * len(CATEGORY_TAGS),
+    "select_top_markets": 50,
+    "render_newsletter": 10,
+}
+
+_SUBJECTS = ["Fed", "Trump", "Ukraine", "OpenAI", "Lakers", "Taylor Swift", "Bitcoin", "ECB", "Apple", "Iran"]
+_TEMPLATES = [
+    "Will {s} announce a deal by {m}?",
+    "Will {s} win the vote in {m}?",
+    "Fed decision in {m}: will {s} cut rates?",
+    "Will {s} tweet more than 100 times in {m}?",  # Blocklisted
+    "What price will Bitcoin hit in {m}?",  # Blocklisted
+    "{s} vs rivals: who wins the LoL: {m} Bo3?",  # Blocklisted
+    "Will {s} release a new product before {m}?",
+]
+_MONTHS = ["January", "February", "March", "June", "September", "December"]
+
+
+def make_markets(n: int, seed: int = 0) -> list[dict]:
+    """Deterministic synthetic markets shaped like Gamma responses."""
+    rng = random.Random(seed)
+    categories = list(CATEGORY_TAGS)
+    markets = []
+    for i in range(n):
+        subject = rng.choice(_SUBJECTS)
+        price = rng.uniform(0.01, 0.99)
+        markets.append({
+            "id": str(i),
+            "question": rng.choice(_TEMPLATES).format(s=subject, m=rng.choice(_MONTHS)),
+            "event_title": f"{subject} event {i % 97}",
+            "slug": f"bench-market-{i}",
+            "description": f"This market resolves to Yes if {subject} outcome {i} happens. " * 3,
+            "category": categories[i % len(categories)],
+            "outcomePrices": json.dumps([f"{price:.3f}", f"{1 - price:.3f}"]),
+            "volume24hr": rng.uniform(10_000, 5_000_000),
+            "oneDayPriceChange": rng.uniform(-0.3, 0.3),
+        })
+    return markets
+
+
+def _blocklist_all(markets: list[dict]) -> int:
+    return sum(is_blocklisted(m["question"]) for m in markets)
+
+
+BENCHMARKS: dict[str, Callable[[list[dict]], object]] = {
+    "filter_markets": filter_markets,
+    "is_blocklisted": _blocklist_all,
+    "select_top_markets": select_top_markets,
+    "render_newsletter": lambda markets: render_newsletter(markets, date_str="Jan 1, 2026"),
+}
+
+
+@dataclass
+class BenchResult:
+    name: str
+    scale: int
+    size: int
+    seconds: float  # Best per-call time across REPEAT rounds
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.scale}x"
+
+
+def run_benchmark(name: str, scale: int, repeat: int = REPEAT) -> BenchResult:
+    size = BASE_SIZES[name] * scale
+    markets = make_markets(size)
+    fn = BENCHMARKS[name]
+    timer = timeit.Timer(lambda: fn(markets))
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return BenchResult(name=name, scale=scale, size=size, seconds=best)
+
+
+def run_suite(names: list[str] | None = None, scales=SCALES, repeat: int = REPEAT) -> list[BenchResult]:
+    return [
+        run_benchmark(name, scale, repeat)
+        for name in (names or BENCHMARKS)
+        for scale in scales
+    ]
+
+
+def load_baselines(path: str = BASELINE_PATH) -> dict[str, float]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baselines(results: list[BenchResult], path: str = BASELINE_PATH) -> None:
+    """Merge results into the baseline file, keeping entries not re-run."""
+    baselines = load_baselines(path)
+    baselines.update({r.key: float(f"{r.seconds:.4g}") for r in results})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(dict(sorted(baselines.items())), f, indent=2)
+        f.write("\n")
+
+
+def _format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def compare(
+    results: list[BenchResult],
+    baselines: dict[str, float],
+    threshold: float = REGRESSION_THRESHOLD,
+) -> tuple[str, list[str]]:
+    """Render a results table against baselines; returns it with the regressed keys."""
+    lines = [f"{'benchmark':<28} {'size':>8} {'time':>11} {'baseline':>11} {'ratio':>7}"]
+    regressions = []
+    for r in results:
+        baseline = baselines.get(r.key)
+        if baseline:
+            ratio = r.seconds / baseline
+            flag = "  REGRESSION" if ratio > threshold else ""
+            if flag:
+                regressions.append(r.key)
+            lines.append(f"{r.key:<28} {r.size:>8} {_format_time(r.seconds):>11} {_format_time(baseline):>11} {ratio:>6.2f}x{flag}")
+        else:
+            lines.append(f"{r.key:<28} {r.size:>8} {_format_time(r.seconds):>11} {'-':>11} {'-':>7}")
+    return "\n".join(lines), regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run pipeline microbenchmarks")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains this")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--save", action="store_true", help="record results as the new baselines")
+    parser.add_argument("--baselines", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    names = [n for n in BENCHMARKS if not args.pattern or args.pattern in n]
+    results = run_suite(names, args.scales, args.repeat)
+    table, regressions = compare(results, load_baselines(args.baselines), args.threshold)
+    print(table)
+
+    if args.save:
+        save_baselines(results, args.baselines)
+        print(f"Baselines written to {args.baselines}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.1f}x: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
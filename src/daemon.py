@@ -0,0 +1,253 @@
+"""Intraday polling daemon that emails alerts for breaking movers.
+
+    python -m src.daemon --interval 300 --threshold 0.10
+
+Markets are re-fetched with conditional requests every interval, so quiet
+categories cost a 304 and reuse the previous payload. Each
+market keeps a fixed-size ring buffer of recent prices, so checking for a
+threshold crossing is a comparison against the oldest sample in the window.
+Markets that stop appearing are evicted, keeping memory flat over days.
+"""
+import argparse
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+if __name__ == "__main__":
+    # Load .env before src modules read their base URLs, data paths and
+    # SEND_RATE at import
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+from src.blocklist import is_blocklisted
+from src.email_template import render_alert
+from src.history import HistoryStore
+from src.http_cache import HTTPCache
+from src.polymarket import fetch_events_by_category, CATEGORY_TAGS
+from src.ranker import _get_probability
+from src.scheduler import deliver_now
+
+POLL_INTERVAL = 300  # Seconds between polls
+ALERT_THRESHOLD = 0.10  # Absolute probability move that triggers an alert
+ALERT_WINDOW = 3600  # Seconds the move must happen within
+MIN_ALERT_VOLUME = 1_000_000  # Only markets this liquid count as major
+ALERT_COOLDOWN = 6 * 3600  # Minimum seconds between alerts for one market
+MAX_ALERTS_PER_DAY = 3  # Global cap on alert emails
+EVICT_AFTER_POLLS = 12  # Drop markets missing from this many consecutive polls
+
+
+@dataclass
+class Alert:
+    market: dict
+    change: float
+
+
+class _Tracked:
+    __slots__ = ("prices", "last_seen", "armed", "last_alert")
+
+    def __init__(self, window_samples: int):
+        self.prices: deque[float] = deque(maxlen=window_samples)
+        self.last_seen = 0
+        self.armed = True
+        self.last_alert = -math.inf
+
+
+class MoverMonitor:
+    """Ring-buffered price tracking with edge-triggered threshold alerts."""
+
+    def __init__(
+        self,
+        threshold: float = ALERT_THRESHOLD,
+        window: float = ALERT_WINDOW,
+        poll_interval: float = POLL_INTERVAL,
+        cooldown: float = ALERT_COOLDOWN,
+        evict_after: int = EVICT_AFTER_POLLS,
+    ):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.evict_after = evict_after
+        self.window_samples = math.ceil(window / poll_interval) + 1
+        self.poll = 0
+        self.markets: dict[str, _Tracked] = {}
+
+    def begin_poll(self) -> None:
+        self.poll += 1
+
+    def update(self, market_id: str, price: float, now: float) -> float | None:
+        """Record a price. Returns the windowed change if it just crossed the threshold."""
+        tracked = self.markets.get(market_id)
+        if tracked is None:
+            tracked = self.markets[market_id] = _Tracked(self.window_samples)
+        tracked.last_seen = self.poll
+        tracked.prices.append(price)
+
+        change = price - tracked.prices[0]
+        if abs(change) < self.threshold / 2:
+            # Hysteresis: re-arm once the move has mostly reverted
+            tracked.armed = True
+            return None
+        if abs(change) < self.threshold or not tracked.armed:
+            return None
+        tracked.armed = False
+        if now - tracked.last_alert < self.cooldown:
+            return None
+        tracked.last_alert = now
+        return change
+
+    def evict_stale(self) -> int:
+        stale = [
+            market_id for market_id, tracked in self.markets.items()
+            if self.poll - tracked.last_seen >= self.evict_after
+        ]
+        for market_id in stale:
+            del self.markets[market_id]
+        return len(stale)
+
+
+class AlertLimiter:
+    """Sliding-window cap on alerts, e.g. at most 3 per 24h."""
+
+    def __init__(self, max_alerts: int = MAX_ALERTS_PER_DAY, period: float = 24 * 3600):
+        self.period = period
+        self.sent: deque[float] = deque(maxlen=max_alerts)
+
+    def allow(self, now: float) -> bool:
+        if len(self.sent) == self.sent.maxlen and now - self.sent[0] < self.period:
+            return False
+        self.sent.append(now)
+        return True
+
+
+def poll_once(
+    monitor: MoverMonitor,
+    now: float,
+    min_volume: float = MIN_ALERT_VOLUME,
+    cache: HTTPCache | None = None,
+    store: HistoryStore | None = None,
+) -> list[Alert]:
+    """Fetch every category once and return alerts for markets that crossed the threshold.
+
+    With a store, every fetched market is also recorded in price history, so
+    the daily run's sub-day mover horizons have intraday samples to use.
+    """
+    monitor.begin_poll()
+    alerts = []
+    for category in CATEGORY_TAGS.keys():
+        markets = fetch_events_by_category(category, limit=20, cache=cache)
+        if store is not None:
+            store.append_markets(markets, timestamp=now)
+        for market in markets:
+            market_id = market.get("id")
+            if not market_id or market.get("volume24hr", 0) < min_volume:
+                continue
+            # Tracked markets already passed the blocklist; only check newcomers
+            if market_id not in monitor.markets and is_blocklisted(market.get("question", "")):
+                continue
+            change = monitor.update(market_id, _get_probability(market), now)
+            if change is not None:
+                alerts.append(Alert(market=market, change=change))
+    monitor.evict_stale()
+    return alerts
+
+
+def alert_key(market_id: str, now: float, cooldown: float = ALERT_COOLDOWN) -> str:
+    """Delivery key for an alert, stable for the cooldown period it fired in.
+
+    The cooldown allows one alert per market per period, so a restarted
+    daemon that re-detects the same move resumes that alert's send instead
+    of mailing it again from the top.
+    """
+    return f"alert-{market_id}-{int(now // cooldown)}"
+
+
+def _send_alert(question: str, **delivery) -> None:
+    try:
+        sent = deliver_now(keep_progress=False, **delivery)
+        print(f"Alert sent to {sent} recipients: {question}")
+    except Exception as e:
+        # Same as a failed poll: log it and keep the daemon running
+        print(f"Alert send failed for {question!r}: {e}")
+
+
+def _window_label(seconds: float) -> str:
+    if seconds % 3600 == 0:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 60)}m"
+
+
+def run_daemon(
+    resend_api_key: str,
+    audience_id: str,
+    from_email: str,
+    poll_interval: float = POLL_INTERVAL,
+    threshold: float = ALERT_THRESHOLD,
+    window: float = ALERT_WINDOW,
+    max_polls: int | None = None,
+) -> None:
+    """Poll until interrupted (or max_polls), emailing rate-limited mover alerts.
+
+    Alerts are sent by a single background worker, so a paced send to a large
+    audience never stalls polling, and queued alerts go out one at a time
+    under the same SEND_RATE.
+    """
+    monitor = MoverMonitor(threshold=threshold, window=window, poll_interval=poll_interval)
+    limiter = AlertLimiter()
+    # max_age=0: every poll revalidates, but unchanged payloads only cost a 304
+    cache = HTTPCache(max_age=0)
+    store = HistoryStore()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-sender") as sender:
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            started = time.time()
+            try:
+                alerts = poll_once(monitor, now=started, cache=cache, store=store)
+            except Exception as e:
+                # A failed poll shouldn't kill a daemon meant to run for days
+                print(f"Poll failed: {e}")
+                alerts = []
+
+            for alert in alerts:
+                if not limiter.allow(started):
+                    print(f"Alert rate limit reached, skipping: {alert.market['question']}")
+                    continue
+                arrow = "up" if alert.change >= 0 else "down"
+                subject = f"Breaking: {alert.market['question']} ({arrow} {abs(alert.change) * 100:.0f} pts)"
+                sender.submit(
+                    _send_alert,
+                    key=alert_key(alert.market["id"], started, monitor.cooldown),
+                    html=render_alert(alert.market, alert.change, _window_label(window)),
+                    subject=subject,
+                    question=alert.market["question"],
+                    resend_api_key=resend_api_key,
+                    audience_id=audience_id,
+                    from_email=from_email,
+                )
+
+            polls += 1
+            if max_polls is None or polls < max_polls:
+                time.sleep(max(0.0, poll_interval - (time.time() - started)))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Poll markets and email breaking-mover alerts")
+    parser.add_argument("--interval", type=float, default=POLL_INTERVAL, help="seconds between polls")
+    parser.add_argument("--threshold", type=float, default=ALERT_THRESHOLD, help="probability move, e.g. 0.10")
+    parser.add_argument("--window", type=float, default=ALERT_WINDOW, help="seconds the move must happen within")
+    args = parser.parse_args()
+
+    run_daemon(
+        resend_api_key=os.environ["RESEND_API_KEY"],
+        audience_id=os.environ["RESEND_AUDIENCE_ID"],
+        from_email=os.environ.get("FROM_EMAIL", "Newsletter <newsletter@yourdomain.com>"),
+        poll_interval=args.interval,
+        threshold=args.threshold,
+        window=args.window,
+    )
+
+
+if __name__ == "__main__":
+    main()
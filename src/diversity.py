@@ -0,0 +1,104 @@
+"""Near-duplicate detection so one storyline can't fill the whole issue.
+
+Each market's question and event title are reduced to a MinHash signature.
+A pair only counts as similar if its signatures agree on at least one LSH
+band, so dissimilar pairs are rejected in a few tuple comparisons. Building
+the index is linear in the number of candidates. Selection only compares
+candidates against the handful of markets already picked.
+"""
+import hashlib
+import random
+import re
+
+NUM_PERMUTATIONS = 32
+BANDS = 8  # 4 rows per band: pairs above ~0.6 Jaccard almost always collide
+SIMILARITY_FLOOR = 0.4  # Estimated Jaccard below this isn't treated as the same story
+DIVERSITY_WEIGHT = 1.0  # Penalty per unit of similarity to an already-picked market
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_STOPWORDS = {
+    "a", "an", "and", "at", "be", "before", "by", "for", "in", "is", "of", "on",
+    "or", "the", "to", "will", "with", "win", "who", "what", "which",
+}
+
+
+def _tokens(market: dict) -> set[str]:
+    text = f"{market.get('question', '')} {market.get('event_title', '')}".lower()
+    return {t for t in re.findall(r"[a-z0-9]+", text) if t not in _STOPWORDS}
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "little")
+
+
+def minhash(tokens: set[str]) -> tuple[int, ...]:
+    """MinHash signature of a token set under NUM_PERMUTATIONS hash functions."""
+    if not tokens:
+        return (_MERSENNE_PRIME,) * NUM_PERMUTATIONS
+    hashes = [_token_hash(t) for t in tokens]
+    return tuple(
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+class DiversityIndex:
+    """MinHash signatures for candidate markets, keyed by object identity."""
+
+    def __init__(self, markets: list[dict]):
+        rows = NUM_PERMUTATIONS // BANDS
+        self.signatures: dict[int, tuple[int, ...]] = {}
+        self.bands: dict[int, tuple[int, ...]] = {}
+        for market in markets:
+            signature = minhash(_tokens(market))
+            self.signatures[id(market)] = signature
+            self.bands[id(market)] = tuple(
+                hash(signature[i:i + rows]) for i in range(0, NUM_PERMUTATIONS, rows)
+            )
+
+    def similarity(self, a: dict, b: dict) -> float:
+        """Estimated Jaccard similarity, or 0 for pairs that share no LSH band."""
+        if not any(x == y for x, y in zip(self.bands[id(a)], self.bands[id(b)])):
+            return 0.0
+        sig_a, sig_b = self.signatures[id(a)], self.signatures[id(b)]
+        estimate = sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERMUTATIONS
+        return estimate if estimate >= SIMILARITY_FLOOR else 0.0
+
+
+def pick_diverse(
+    pool: list[dict],
+    count: int,
+    selected: list[dict],
+    index: DiversityIndex,
+    relevance,
+    weight: float = DIVERSITY_WEIGHT,
+) -> list[dict]:
+    """Greedy maximal-marginal-relevance pick of `count` markets from pool.
+
+    Each step takes the candidate with the best normalised relevance minus
+    `weight` times its similarity to anything already selected.
+    """
+    remaining = list(pool)
+    if not remaining:
+        return []
+    top = max(relevance(m) for m in remaining) or 1.0
+    # Max similarity to anything chosen so far, updated only against each new pick
+    penalty = {
+        id(m): max((index.similarity(m, s) for s in selected), default=0.0)
+        for m in remaining
+    }
+    picked = []
+
+    for _ in range(min(count, len(remaining))):
+        best = max(remaining, key=lambda m: relevance(m) / top - weight * penalty[id(m)])
+        remaining.remove(best)
+        picked.append(best)
+        for m in remaining:
+            penalty[id(m)] = max(penalty[id(m)], index.similarity(m, best))
+    return picked
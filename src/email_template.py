@@ -136,3 +136,45 @@ def render_newsletter(markets: list[dict], date_str: str) -> str:
   </table>
 </body>
 </html>"""
+
+
+def render_alert(market: dict, change: float, window: str) -> str:
+    """Render a short breaking-mover alert email."""
+    question = market["question"]
+    link = f"https://polymarket.com/event/{market['slug']}"
+    probability = _format_probability(market["outcomePrices"])
+    arrow, change_str, color = _format_change(change)
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>Breaking mover</title>
+</head>
+<body style="margin: 0; padding: 24px 16px; background-color: #f3f4f6;">
+  <table width="600" align="center" cellpadding="0" cellspacing="0" border="0" style="background-color: #ffffff; border-radius: 8px;">
+    <tr>
+      <td style="padding: 24px 32px; font-family: Arial, sans-serif;">
+        <div style="font-size: 12px; font-weight: bold; color: #dc2626; text-transform: uppercase;">
+          Breaking mover
+        </div>
+        <div style="font-size: 18px; font-weight: bold; color: #111827; margin: 8px 0;">
+          {question}
+        </div>
+        <div style="font-size: 22px; font-weight: bold; color: #111827;">
+          {probability}
+          <span style="font-size: 15px; color: {color};">{arrow} {change_str} in {window}</span>
+        </div>
+        <div style="margin-top: 12px;">
+          <a href="{link}" style="font-size: 13px; color: #2563eb; text-decoration: none;">
+            View on Polymarket &rarr;
+          </a>
+        </div>
+        <div style="font-size: 12px; color: #9ca3af; margin-top: 16px;">
+          <a href="{{{{{{RESEND_UNSUBSCRIBE_URL}}}}}}" style="color: #6b7280;">Unsubscribe</a>
+        </div>
+      </td>
+    </tr>
+  </table>
+</body>
+</html>"""
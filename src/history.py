@@ -0,0 +1,143 @@
+"""Append-only price/volume history per market, with multi-horizon mover stats.
+
+Each market gets one binary file of fixed-width little-endian records
+(timestamp, price, volume24hr) as float64. Appends are a single write;
+reads memory-map the file and binary-search the timestamp column, so a
+lookup only touches the pages it needs even with months of samples.
+"""
+import math
+import mmap
+import os
+import statistics
+import struct
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+
+from src.ranker import _get_probability
+
+HISTORY_DIR = os.environ.get("HISTORY_DIR", "data/history")
+
+RECORD = struct.Struct("<ddd")
+FIELDS = RECORD.size // 8
+
+MOVER_HORIZONS = {
+    "1h": 3600,
+    "6h": 6 * 3600,
+    "24h": 24 * 3600,
+    "7d": 7 * 24 * 3600,
+}
+
+# A horizon is scored against the sample nearest to `horizon` ago, and only if
+# that sample is within this fraction of the horizon either side. Daily-only
+# history then can't pass off yesterday's move as an hourly one, and cron
+# jitter can't push the 24h lookup onto a two-day-old sample.
+HORIZON_TOLERANCE = 0.5
+
+# Volatility is estimated from sample-to-sample changes over this window
+VOLATILITY_WINDOW = 7 * 24 * 3600
+
+# Typical daily move used to put markets without history on the z-score scale
+FALLBACK_DAILY_VOLATILITY = 0.05
+
+
+@dataclass
+class MoverStats:
+    deltas: dict[str, float] = field(default_factory=dict)
+    zscores: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def score(self) -> float | None:
+        """Largest absolute z-score across horizons, or None without history."""
+        if not self.zscores:
+            return None
+        return max(abs(z) for z in self.zscores.values())
+
+
+class HistoryStore:
+    def __init__(self, root: str = HISTORY_DIR):
+        self.root = root
+
+    def _path(self, market_id: str) -> str:
+        safe_id = "".join(c for c in str(market_id) if c.isalnum() or c in "-_")
+        return os.path.join(self.root, f"{safe_id}.bin")
+
+    def append(self, market_id: str, timestamp: float, price: float, volume: float) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._path(market_id), "ab") as f:
+            f.write(RECORD.pack(timestamp, price, volume))
+
+    def append_markets(self, markets: list[dict], timestamp: float | None = None) -> int:
+        """Record one sample per market. Returns the number of samples written."""
+        timestamp = time.time() if timestamp is None else timestamp
+        written = 0
+        for market in markets:
+            market_id = market.get("id")
+            if not market_id:
+                continue
+            self.append(market_id, timestamp, _get_probability(market), float(market.get("volume24hr") or 0))
+            written += 1
+        return written
+
+    def mover_stats(self, market_id: str, now: float | None = None) -> MoverStats:
+        """Compute price deltas and volatility-normalised z-scores per horizon."""
+        now = time.time() if now is None else now
+        path = self._path(market_id)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return MoverStats()
+        count = size // RECORD.size
+        if count < 2:
+            return MoverStats()
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as raw, raw[: count * RECORD.size].cast("d") as columns:
+                return _compute_stats(columns[0::FIELDS], columns[1::FIELDS], now)
+
+
+def _compute_stats(timestamps, prices, now: float) -> MoverStats:
+    """Derive MoverStats from strided timestamp/price columns."""
+    end = bisect_right(timestamps, now)
+    if end < 2:
+        return MoverStats()
+    latest_ts = timestamps[end - 1]
+    latest = prices[end - 1]
+
+    window_start = bisect_right(timestamps, latest_ts - VOLATILITY_WINDOW)
+    window = prices[max(window_start - 1, 0):end].tolist()
+    steps = [b - a for a, b in zip(window, window[1:])]
+    step_sigma = statistics.pstdev(steps) if len(steps) >= 2 else 0.0
+
+    stats = MoverStats()
+    for name, seconds in MOVER_HORIZONS.items():
+        i = _nearest(timestamps, latest_ts - seconds, end - 1)
+        if i is None or abs(timestamps[i] - (latest_ts - seconds)) > HORIZON_TOLERANCE * seconds:
+            continue
+        delta = latest - prices[i]
+        stats.deltas[name] = delta
+        if step_sigma > 0:
+            # Random-walk scaling: sigma grows with the square root of steps taken
+            horizon_sigma = step_sigma * math.sqrt(end - 1 - i)
+            stats.zscores[name] = delta / horizon_sigma
+    return stats
+
+
+def _nearest(timestamps, target: float, hi: int) -> int | None:
+    """Index in timestamps[:hi] closest to target, or None if hi is 0."""
+    j = bisect_left(timestamps, target, 0, hi)
+    candidates = [k for k in (j - 1, j) if 0 <= k < hi]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda k: abs(timestamps[k] - target))
+
+
+def annotate_movers(markets: list[dict], store: HistoryStore, now: float | None = None) -> None:
+    """Attach price_deltas and a comparable mover_score to each market in place."""
+    for market in markets:
+        stats = store.mover_stats(market["id"], now=now) if market.get("id") else MoverStats()
+        market["price_deltas"] = stats.deltas
+        score = stats.score
+        if score is None:
+            score = abs(market.get("oneDayPriceChange", 0)) / FALLBACK_DAILY_VOLATILITY
+        market["mover_score"] = score
@@ -0,0 +1,133 @@
+"""Disk-backed HTTP response cache with conditional revalidation.
+
+Fresh entries (younger than max_age) are served from disk without a request.
+Stale entries are revalidated with If-None-Match/If-Modified-Since, so an
+unchanged payload costs a 304. Bodies are stored gzip-compressed and the
+cache is trimmed least-recently-used first once it exceeds max_bytes.
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+
+import requests
+
+from src.atomic import atomic_write
+
+HTTP_CACHE_DIR = os.environ.get("HTTP_CACHE_DIR", "data/http_cache")
+HTTP_CACHE_MAX_AGE = float(os.environ.get("HTTP_CACHE_MAX_AGE", "300"))
+HTTP_CACHE_MAX_BYTES = int(os.environ.get("HTTP_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0  # Served from disk without a request
+    revalidated: int = 0  # 304 from the server
+    misses: int = 0  # Full download
+
+    def __str__(self) -> str:
+        return f"{self.hits} fresh hits, {self.revalidated} revalidated (304), {self.misses} misses"
+
+
+class HTTPCache:
+    def __init__(
+        self,
+        root: str = HTTP_CACHE_DIR,
+        max_age: float = HTTP_CACHE_MAX_AGE,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+    ):
+        self.root = root
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._index_path = os.path.join(root, "index.json")
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict[str, dict]:
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self) -> None:
+        with atomic_write(self._index_path) as f:
+            json.dump(self._index, f)
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json.gz")
+
+    @staticmethod
+    def _key(url: str, params: dict) -> str:
+        raw = json.dumps([url, sorted((k, str(v)) for k, v in params.items())])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _read_body(self, key: str):
+        try:
+            with gzip.open(self._body_path(key), "rt") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key: str, payload, headers, now: float) -> None:
+        body = gzip.compress(json.dumps(payload).encode())
+        with atomic_write(self._body_path(key), "wb") as f:
+            f.write(body)
+        self._index[key] = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": now,
+            "last_used": now,
+            "size": len(body),
+        }
+        self._evict()
+
+    def _evict(self) -> None:
+        total = sum(entry["size"] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self._index.pop(key)["size"]
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+
+    def get_json(self, url: str, params: dict, timeout: float | None = None):
+        """GET url and return its JSON payload, using the cache where possible."""
+        key = self._key(url, params)
+        entry = self._index.get(key)
+        now = time.time()
+
+        payload = self._read_body(key) if entry else None
+        if payload is None:
+            entry = None
+        elif now - entry["fetched_at"] < self.max_age:
+            self.stats.hits += 1
+            entry["last_used"] = now
+            self._save_index()
+            return payload
+
+        headers = {"Accept-Encoding": "gzip, deflate"}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = requests.get(url, params=params, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry:
+            self.stats.revalidated += 1
+            entry["fetched_at"] = now
+            entry["last_used"] = now
+            self._save_index()
+            return payload
+
+        response.raise_for_status()
+        payload = response.json()
+        self.stats.misses += 1
+        self._store(key, payload, response.headers, now)
+        self._save_index()
+        return payload
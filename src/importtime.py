@@ -0,0 +1,82 @@
+"""Report per-module import cost for a cold start, using ``python -X importtime``.
+
+    python -m src.importtime              # profile `import src.main`
+    python -m src.importtime src.llm -n 10
+"""
+import argparse
+import subprocess
+import sys
+from dataclasses import dataclass
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    """Parse the `import time:` lines emitted by -X importtime."""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # Header row
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        timings.append(ImportTiming(
+            module=stripped,
+            self_us=int(fields[0]),
+            cumulative_us=int(fields[1]),
+            depth=(len(name) - len(stripped) - 1) // 2,
+        ))
+    return timings
+
+
+def profile_imports(target: str = "src.main") -> list[ImportTiming]:
+    """Import target in a fresh interpreter and return its import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def _top_level(module: str) -> str:
+    return module.split(".", 1)[0]
+
+
+def format_report(timings: list[ImportTiming], top: int = 20) -> str:
+    """Render per-package totals and the slowest individual modules."""
+    by_package: dict[str, int] = {}
+    for t in timings:
+        package = _top_level(t.module)
+        by_package[package] = by_package.get(package, 0) + t.self_us
+    total_us = sum(by_package.values())
+
+    lines = [f"Total import time: {total_us / 1000:.1f} ms", "", "Per package (self time):"]
+    for package, us in sorted(by_package.items(), key=lambda x: -x[1])[:top]:
+        lines.append(f"  {us / 1000:8.1f} ms  {package}")
+
+    lines += ["", "Slowest modules (self / cumulative):"]
+    for t in sorted(timings, key=lambda t: -t.self_us)[:top]:
+        lines.append(f"  {t.self_us / 1000:8.1f} / {t.cumulative_us / 1000:8.1f} ms  {t.module}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report import cost per module")
+    parser.add_argument("target", nargs="?", default="src.main", help="module to import")
+    parser.add_argument("-n", "--top", type=int, default=20)
+    args = parser.parse_args()
+    print(format_report(profile_imports(args.target), top=args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Versioned on-disk artifact for a prepared newsletter issue.
+
+`python -m src.main prepare` writes one of these ahead of the send window;
+`python -m src.main send` only has to load it and deliver.
+"""
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+from src.atomic import atomic_write
+
+ISSUE_DIR = os.environ.get("ISSUE_DIR", "data/issues")
+ISSUE_VERSION = 1
+
+# An artifact older than this is considered stale and re-prepared at send time
+ISSUE_MAX_AGE = float(os.environ.get("ISSUE_MAX_AGE", str(6 * 3600)))
+
+
+@dataclass
+class Issue:
+    date_str: str
+    subject: str
+    html: str
+    markets: list[dict]
+    created_at: float
+    version: int = ISSUE_VERSION
+
+
+def _issue_path(root: str, day: datetime) -> str:
+    return os.path.join(root, f"issue-{day:%Y-%m-%d}.json")
+
+
+def save_issue(issue: Issue, root: str = ISSUE_DIR) -> str:
+    """Write the issue for its creation day (UTC), atomically. Returns the path."""
+    path = _issue_path(root, datetime.fromtimestamp(issue.created_at, timezone.utc))
+    with atomic_write(path) as f:
+        json.dump(asdict(issue), f)
+    return path
+
+
+def load_fresh_issue(
+    root: str = ISSUE_DIR,
+    max_age: float = ISSUE_MAX_AGE,
+    now: float | None = None,
+) -> Issue | None:
+    """Load today's issue if it exists, matches ISSUE_VERSION and isn't stale."""
+    now = time.time() if now is None else now
+    path = _issue_path(root, datetime.fromtimestamp(now, timezone.utc))
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if data.get("version") != ISSUE_VERSION:
+        return None
+    try:
+        issue = Issue(**data)
+    except TypeError:
+        return None
+    if now - issue.created_at > max_age:
+        return None
+    return issue
@@ -0,0 +1,40 @@
+import importlib
+
+
+class LazyImport:
+    """Stand-in for a module, or one of its attributes, that imports on first use.
+
+    Attribute reads, writes and calls are forwarded to the real object, so
+    ``resend = LazyImport("resend")`` behaves like ``import resend`` except the
+    SDK is only loaded when a stage actually touches it.
+    """
+
+    def __init__(self, module_name: str, attr: str | None = None):
+        object.__setattr__(self, "_module_name", module_name)
+        object.__setattr__(self, "_attr", attr)
+        object.__setattr__(self, "_target", None)
+
+    def _load(self):
+        target = object.__getattribute__(self, "_target")
+        if target is None:
+            target = importlib.import_module(self._module_name)
+            if self._attr is not None:
+                target = getattr(target, self._attr)
+            object.__setattr__(self, "_target", target)
+        return target
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        name = self._module_name if self._attr is None else f"{self._module_name}.{self._attr}"
+        return f"<LazyImport {name}>"
@@ -1,18 +1,306 @@
 import json
-from dataclasses import dataclass
+import os
+import threading
+import time
+from dataclasses import dataclass, field
 
-from groq import Groq
+from src.atomic import atomic_write
+from src.lazy import LazyImport
+from src.resilience import CircuitBreaker, Deadline
 
+# Only loaded when Stage 4 runs, so dry runs never import the Groq SDK
+groq = LazyImport("groq")
+Groq = LazyImport("groq", "Groq")
+
+# None lets the SDK use its default endpoint
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL")
+
+GROQ_TIMEOUT = 20.0  # Seconds per request attempt
+GROQ_MAX_RETRIES = 1  # SDK retries of transient errors
+
+# Verdicts and summaries from earlier runs, reused when Groq is unavailable
+JUDGMENT_CACHE_PATH = os.environ.get("JUDGMENT_CACHE_PATH", "data/judgments.json")
+
+# Seconds a cached judgment stays usable. Summaries quote the odds, so they go
+# stale within a day; whether a market is newsworthy changes more slowly.
+JUDGMENT_MAX_AGE = {
+    "worthy": 7 * 24 * 3600,
+    "summary": 24 * 3600,
+}
+
+DEFAULT_MODEL = "llama-3.1-8b-instant"
+
+
+def _parse_models(value: str) -> list[str]:
+    """Split a comma-separated model list, ignoring whitespace and empty entries."""
+    return [model.strip() for model in value.split(",") if model.strip()]
+
+
+# Classification tries each model in order, escalating while the verdict's
+# confidence is below ESCALATION_CONFIDENCE. Override with a comma-separated list.
+MODEL_CASCADE = _parse_models(os.environ.get("LLM_MODEL_CASCADE", f"{DEFAULT_MODEL},llama-3.3-70b-versatile"))
+ESCALATION_CONFIDENCE = float(os.environ.get("LLM_ESCALATION_CONFIDENCE", "0.7"))
 
 SYSTEM_PROMPT = """You evaluate prediction markets for a news digest. Respond in JSON only.
 A market is newsworthy if: (1) it concerns events affecting many people, and (2) the current odds reveal something the mainstream news isn't stating clearly.
 Reject: celebrity gossip, social media metrics, crypto price bets, trivial predictions."""
 
+# Appended to the prompt when the first response could not be parsed
+STRICT_SUFFIX = """
+
+Your previous reply was not valid JSON. Reply with exactly one JSON object and nothing else: no prose, no code fences."""
+
 
 @dataclass
 class LLMResult:
     worthy: bool
     summary: str | None
+    confidence: float | None = None
+
+
+@dataclass
+class TierStats:
+    calls: int = 0
+    latency: float = 0.0  # Total seconds spent waiting on this model
+
+    @property
+    def mean_latency(self) -> float:
+        return self.latency / self.calls if self.calls else 0.0
+
+
+@dataclass
+class JudgeStats:
+    """Per-run counters for LLM response handling."""
+
+    calls: int = 0
+    parse_failures: int = 0
+    retries: int = 0
+    unrecovered: int = 0
+    classifications: int = 0
+    escalations: int = 0
+    tiers: dict[str, TierStats] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, **counts: int) -> None:
+        """Increment counters; safe to call from concurrent judging threads."""
+        with self._lock:
+            for name, n in counts.items():
+                setattr(self, name, getattr(self, name) + n)
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        with self._lock:
+            tier = self.tiers.setdefault(model, TierStats())
+            tier.calls += 1
+            tier.latency += seconds
+
+    @property
+    def parse_failure_rate(self) -> float:
+        if self.calls == 0:
+            return 0.0
+        return self.parse_failures / self.calls
+
+    @property
+    def escalation_rate(self) -> float:
+        """Fraction of classifications that went past the first model."""
+        if self.classifications == 0:
+            return 0.0
+        return self.escalations / self.classifications
+
+
+def _extract_json(text: str) -> dict | None:
+    """Return the first balanced JSON object embedded in text, or None."""
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start != -1:
+        try:
+            data, _ = decoder.raw_decode(text, start)
+        except json.JSONDecodeError:
+            start = text.find("{", start + 1)
+            continue
+        if isinstance(data, dict):
+            return data
+        start = text.find("{", start + 1)
+    return None
+
+
+def _coerce_bool(value) -> bool | None:
+    """Coerce common boolean spellings, returning None if not recognisable."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "yes", "1"):
+            return True
+        if lowered in ("false", "no", "0"):
+            return False
+    return None
+
+
+def _clean_summary(summary) -> str | None:
+    if summary is None:
+        return None
+    summary = str(summary).strip()
+    if not summary or summary.lower() in ("null", "none"):
+        return None
+    return summary
+
+
+def _parse_result(content: str | None) -> LLMResult | None:
+    """Validate and coerce a model response into an LLMResult, or None if invalid."""
+    if not content:
+        return None
+    data = _extract_json(content)
+    if data is None or "worthy" not in data:
+        return None
+
+    worthy = _coerce_bool(data["worthy"])
+    if worthy is None:
+        return None
+
+    summary = _clean_summary(data.get("summary"))
+    return LLMResult(worthy=worthy, summary=summary if worthy else None)
+
+
+def _coerce_confidence(value) -> float:
+    """Clamp a confidence to [0, 1]; anything unreadable counts as no confidence."""
+    try:
+        confidence = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if confidence != confidence:  # NaN
+        return 0.0
+    return min(max(confidence, 0.0), 1.0)
+
+
+def _parse_verdict(content: str | None) -> LLMResult | None:
+    """Like _parse_result, but expects the worthy flag plus a confidence."""
+    result = _parse_result(content)
+    if result is None:
+        return None
+    data = _extract_json(content)
+    return LLMResult(worthy=result.worthy, summary=None, confidence=_coerce_confidence(data.get("confidence")))
+
+
+def _parse_summary(content: str | None) -> LLMResult | None:
+    """Accept a response carrying a non-empty summary."""
+    if not content:
+        return None
+    data = _extract_json(content)
+    if data is None:
+        return None
+    summary = _clean_summary(data.get("summary"))
+    if summary is None:
+        return None
+    return LLMResult(worthy=True, summary=summary)
+
+
+def _complete(
+    client,
+    user_prompt: str,
+    temperature: float = 0.3,
+    max_tokens: int = 200,
+    model: str = DEFAULT_MODEL,
+    stats: JudgeStats | None = None,
+    breaker: CircuitBreaker | None = None,
+    deadline: Deadline | None = None,
+) -> str | None:
+    """Request a JSON-mode chat completion and return the message content.
+
+    With a breaker, each request is measured against its SLO on its own, so
+    an escalation through the cascade isn't mistaken for one slow call. With
+    a deadline, no request starts after it passes, and the timeout is capped
+    so the request and its SDK retries finish before it.
+    """
+    timeout = GROQ_TIMEOUT
+    if deadline is not None:
+        deadline.check()
+        timeout = deadline.timeout(GROQ_TIMEOUT, attempts=GROQ_MAX_RETRIES + 1)
+
+    def request():
+        # Timed in here so calls the breaker or deadline rejected before
+        # reaching Groq don't drag down the tier's mean latency
+        started = time.perf_counter()
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"},
+                timeout=timeout,
+            )
+        except groq.BadRequestError:
+            # JSON mode rejects generations that fail server-side validation;
+            # that's a bad generation, not an unhealthy upstream
+            return None
+        finally:
+            if stats is not None:
+                stats.record_latency(model, time.perf_counter() - started)
+        return response.choices[0].message.content
+
+    return breaker.call(request) if breaker is not None else request()
+
+
+def _ask(
+    client,
+    user_prompt: str,
+    parse,
+    max_tokens: int,
+    stats: JudgeStats,
+    model: str = DEFAULT_MODEL,
+    breaker: CircuitBreaker | None = None,
+    deadline: Deadline | None = None,
+) -> LLMResult | None:
+    """Complete and parse, retrying once with a tighter prompt on a parse failure."""
+    stats.add(calls=1)
+    result = parse(_complete(
+        client,
+        user_prompt,
+        max_tokens=max_tokens,
+        model=model,
+        stats=stats,
+        breaker=breaker,
+        deadline=deadline,
+    ))
+    if result is not None:
+        return result
+
+    stats.add(parse_failures=1, retries=1)
+    result = parse(_complete(
+        client,
+        user_prompt + STRICT_SUFFIX,
+        temperature=0.0,
+        max_tokens=max_tokens,
+        model=model,
+        stats=stats,
+        breaker=breaker,
+        deadline=deadline,
+    ))
+    if result is None:
+        stats.add(unrecovered=1)
+    return result
+
+
+def groq_client(api_key: str):
+    """A Groq client; build one per run and share it so calls reuse its connection pool."""
+    return Groq(
+        api_key=api_key,
+        base_url=GROQ_BASE_URL,
+        timeout=GROQ_TIMEOUT,
+        max_retries=GROQ_MAX_RETRIES,
+    )
+
+
+def _market_header(question: str, category: str, probability: float, change: float) -> str:
+    change_str = f"+{change*100:.0f}%" if change >= 0 else f"{change*100:.0f}%"
+    return f"""Market: {question}
+Category: {category}
+Current: {probability*100:.0f}% | 24h change: {change_str}"""
 
 
 def judge_market(
@@ -21,33 +309,139 @@ def judge_market(
     probability: float,
     change: float,
     api_key: str,
+    stats: JudgeStats | None = None,
 ) -> LLMResult:
     """Use Groq LLM to judge if a market is newsworthy and generate a summary."""
-    client = Groq(api_key=api_key)
-
-    change_str = f"+{change*100:.0f}%" if change >= 0 else f"{change*100:.0f}%"
-    user_prompt = f"""Market: {question}
-Category: {category}
-Current: {probability*100:.0f}% | 24h change: {change_str}
+    client = groq_client(api_key)
+    user_prompt = f"""{_market_header(question, category, probability, change)}
 
 {{"worthy": true/false, "summary": "2-3 sentences if worthy, else null"}}"""
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.3,
-        max_tokens=200,
+    result = _ask(client, user_prompt, _parse_result, 200, stats or JudgeStats())
+    return result or LLMResult(worthy=False, summary=None)
+
+
+def classify_market(
+    question: str,
+    category: str,
+    probability: float,
+    change: float,
+    api_key: str | None = None,
+    stats: JudgeStats | None = None,
+    breaker: CircuitBreaker | None = None,
+    deadline: Deadline | None = None,
+    client=None,
+) -> bool:
+    """Cheap first pass: return whether a market is newsworthy, without a summary.
+
+    Walks MODEL_CASCADE, escalating to the next model when the verdict is
+    unparseable or its confidence is below ESCALATION_CONFIDENCE. Pass a shared
+    `client` from groq_client() instead of api_key when judging many markets.
+    """
+    client = client or groq_client(api_key)
+    stats = stats or JudgeStats()
+    user_prompt = f"""{_market_header(question, category, probability, change)}
+
+{{"worthy": true/false, "confidence": 0.0-1.0}}"""
+
+    stats.add(classifications=1)
+    verdict = None
+    for tier, model in enumerate(MODEL_CASCADE):
+        if tier == 1:
+            stats.add(escalations=1)
+        result = _ask(client, user_prompt, _parse_verdict, 24, stats, model=model, breaker=breaker, deadline=deadline)
+        if result is not None:
+            verdict = result
+            if result.confidence >= ESCALATION_CONFIDENCE:
+                break
+    return verdict is not None and verdict.worthy
+
+
+def summarize_market(
+    question: str,
+    category: str,
+    probability: float,
+    change: float,
+    api_key: str | None = None,
+    stats: JudgeStats | None = None,
+    breaker: CircuitBreaker | None = None,
+    deadline: Deadline | None = None,
+    client=None,
+) -> str | None:
+    """Second pass for selected markets: a 2-3 sentence summary, or None on failure."""
+    client = client or groq_client(api_key)
+    user_prompt = f"""{_market_header(question, category, probability, change)}
+
+This market was judged newsworthy. Explain why in 2-3 sentences.
+{{"summary": "..."}}"""
+
+    result = _ask(client, user_prompt, _parse_summary, 200, stats or JudgeStats(), breaker=breaker, deadline=deadline)
+    return result.summary if result else None
+
+
+def heuristic_summary(probability: float, change: float, volume: float) -> str:
+    """Non-LLM summary used when Groq is unavailable and nothing is cached."""
+    previous = min(max(probability - change, 0.0), 1.0)
+    direction = "up" if change >= 0 else "down"
+    return (
+        f"Odds moved {direction} from {previous * 100:.0f}% to {probability * 100:.0f}% "
+        f"over the past day on ${volume:,.0f} of trading volume."
     )
 
-    content = response.choices[0].message.content
-    try:
-        data = json.loads(content)
-        return LLMResult(
-            worthy=data.get("worthy", False),
-            summary=data.get("summary"),
-        )
-    except (json.JSONDecodeError, KeyError):
-        return LLMResult(worthy=False, summary=None)
+
+class JudgmentCache:
+    """Verdicts and summaries keyed by market id, persisted between runs.
+
+    Each field is stored with the time it was written and expires after its
+    JUDGMENT_MAX_AGE; expired fields are pruned on save.
+    """
+
+    def __init__(self, path: str = JUDGMENT_CACHE_PATH, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.entries: dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _fresh(self, name: str, field: dict, now: float) -> bool:
+        return isinstance(field, dict) and now - field.get("at", 0) <= JUDGMENT_MAX_AGE.get(name, 0)
+
+    def get(self, market_id: str | None, name: str):
+        """The cached value of one field, or None if missing or expired."""
+        if not market_id:
+            return None
+        field = self.entries.get(str(market_id), {}).get(name)
+        if not self._fresh(name, field, self.clock()):
+            return None
+        return field["value"]
+
+    def put(self, market_id: str | None, **fields) -> None:
+        if not market_id:
+            return
+        now = self.clock()
+        with self._lock:
+            entry = self.entries.setdefault(str(market_id), {})
+            for name, value in fields.items():
+                entry[name] = {"value": value, "at": now}
+
+    def prune(self) -> int:
+        """Drop expired fields, and entries left empty. Returns the fields dropped."""
+        now = self.clock()
+        dropped = 0
+        with self._lock:
+            for market_id in list(self.entries):
+                entry = self.entries[market_id]
+                for name in [n for n, field in entry.items() if not self._fresh(n, field, now)]:
+                    del entry[name]
+                    dropped += 1
+                if not entry:
+                    del self.entries[market_id]
+        return dropped
+
+    def save(self) -> None:
+        self.prune()
+        with self._lock, atomic_write(self.path) as f:
+            json.dump(self.entries, f)
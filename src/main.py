@@ -1,16 +1,42 @@
+import argparse
 import json
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from datetime import datetime, timezone
 
-from dotenv import load_dotenv
+if __name__ == "__main__":
+    # Load .env before src modules read their base-URL overrides; skipped on
+    # import so tests and tooling don't pay for dotenv
+    from dotenv import load_dotenv
 
-load_dotenv()
+    load_dotenv()
 
-from src.polymarket import fetch_events_by_category, CATEGORY_TAGS
+from src.history import HistoryStore, annotate_movers
+from src.http_cache import HTTPCache
+from src.issue import Issue, load_fresh_issue, save_issue
+from src.polymarket import (
+    fetch_events_by_category,
+    load_snapshot,
+    save_snapshot,
+    CATEGORY_TAGS,
+    REQUEST_TIMEOUT,
+)
 from src.ranker import filter_markets, select_top_markets
-from src.llm import judge_market
-from src.email_template import render_newsletter
-from src.sender import send_newsletter
+from src.llm import (
+    JudgeStats,
+    JudgmentCache,
+    classify_market,
+    groq_client,
+    heuristic_summary,
+    summarize_market,
+)
+from src.resilience import Deadline, RunGuard
+from src.payload import optimize_newsletter
+from src.profiler import PROFILE_DIR, SamplingProfiler, set_stage
+from src.scheduler import DeliveryIncomplete, deliver_now
 
 
 def _get_probability(market: dict) -> float:
@@ -21,66 +47,379 @@ def _get_probability(market: dict) -> float:
     return float(prices[0])
 
 
-def run(
-    resend_api_key: str,
-    audience_id: str,
-    from_email: str,
-    groq_api_key: str,
-) -> None:
-    """Orchestrate the newsletter pipeline: fetch -> filter -> judge -> select -> send."""
-    # Stage 1: Fetch from all categories
+# Parallel Groq requests in the judging passes
+LLM_CONCURRENCY = 4
+
+
+def _llm_kwargs(market: dict) -> dict:
+    return {
+        "question": market["question"],
+        "category": market.get("category", "unknown"),
+        "probability": _get_probability(market),
+        "change": market.get("oneDayPriceChange", 0),
+    }
+
+
+def _fetch_all_markets(
+    store: HistoryStore | None = None,
+    cache: HTTPCache | None = None,
+    guard: RunGuard | None = None,
+) -> list[dict]:
+    """Fetch markets from every configured category, recording them in history.
+
+    Categories that fail, or are skipped because the Gamma breaker is open,
+    are filled from the last snapshot. A fully successful fetch replaces it.
+    """
+    guard = guard or RunGuard()
     all_markets = []
+    failed = []
     for category in CATEGORY_TAGS.keys():
-        markets = fetch_events_by_category(category, limit=20)
+        try:
+            markets = guard.gamma.call(
+                fetch_events_by_category,
+                category,
+                limit=20,
+                cache=cache,
+                timeout=guard.deadline.timeout(REQUEST_TIMEOUT),
+            )
+        except Exception as e:
+            print(f"Gamma fetch failed for {category}: {e}")
+            failed.append(category)
+            continue
         all_markets.extend(markets)
+    if cache is not None:
+        print(f"HTTP cache: {cache.stats}", file=sys.stderr)
+    if store is not None:
+        # Before any snapshot fallback: stale prices would be recorded as current
+        store.append_markets(all_markets)
+
+    if failed:
+        snapshot = load_snapshot()
+        if snapshot is not None:
+            markets, saved_at = snapshot
+            all_markets.extend(m for m in markets if m.get("category") in failed)
+            age_hours = (time.time() - saved_at) / 3600
+            print(f"Using {age_hours:.1f}h old snapshot for: {', '.join(failed)}")
+            guard.report.note("gamma:stale-snapshot")
+        else:
+            guard.report.note("gamma:missing-categories")
+    elif all_markets:
+        save_snapshot(all_markets)
+    return all_markets
+
+
+def _map_until_deadline(fn, items: list, deadline: Deadline, fallback) -> list:
+    """Run fn over items on the LLM pool, using fallback(item) for any unfinished at the deadline."""
+    pool = ThreadPoolExecutor(max_workers=LLM_CONCURRENCY)
+    futures = [pool.submit(fn, item) for item in items]
+    wait(futures, timeout=deadline.remaining())
+    # Don't block on stragglers; their requests are already capped by the deadline
+    pool.shutdown(wait=False, cancel_futures=True)
+    return [
+        future.result() if future.done() and not future.cancelled() else fallback(item)
+        for future, item in zip(futures, items)
+    ]
+
+
+def _classify(market: dict, client, stats: JudgeStats, guard: RunGuard, judgments: JudgmentCache) -> bool:
+    """Classify through the Groq breaker, falling back to a cached verdict or the filters."""
+    if not guard.deadline.expired:
+        try:
+            worthy = classify_market(
+                **_llm_kwargs(market),
+                client=client,
+                stats=stats,
+                breaker=guard.groq,
+                deadline=guard.deadline,
+            )
+            judgments.put(market.get("id"), worthy=worthy)
+            return worthy
+        except Exception as e:
+            print(f"Classification failed for {market['question']!r}: {e}")
+    return _fallback_verdict(market, guard, judgments)
+
+
+def _fallback_verdict(market: dict, guard: RunGuard, judgments: JudgmentCache) -> bool:
+    cached = judgments.get(market.get("id"), "worthy")
+    if cached is not None:
+        guard.report.note("groq:cached-verdict")
+        return cached
+    # The market already passed the blocklist and volume filters
+    guard.report.note("groq:heuristic-verdict")
+    return True
+
+
+def _summarize(market: dict, client, stats: JudgeStats, guard: RunGuard, judgments: JudgmentCache) -> str | None:
+    """Summarize through the Groq breaker, falling back to a cached or heuristic summary."""
+    if not guard.deadline.expired:
+        try:
+            summary = summarize_market(
+                **_llm_kwargs(market),
+                client=client,
+                stats=stats,
+                breaker=guard.groq,
+                deadline=guard.deadline,
+            )
+            if summary:
+                judgments.put(market.get("id"), summary=summary)
+            return summary
+        except Exception as e:
+            print(f"Summary failed for {market['question']!r}: {e}")
+    return _fallback_summary(market, guard, judgments)
+
+
+def _fallback_summary(market: dict, guard: RunGuard, judgments: JudgmentCache) -> str:
+    cached = judgments.get(market.get("id"), "summary")
+    if cached:
+        guard.report.note("groq:cached-summary")
+        return cached
+    guard.report.note("groq:heuristic-summary")
+    return heuristic_summary(
+        probability=_get_probability(market),
+        change=market.get("oneDayPriceChange", 0),
+        volume=market.get("volume24hr", 0),
+    )
+
+
+def _date_str() -> str:
+    return datetime.now(timezone.utc).strftime("%b %-d, %Y")
+
+
+def dry_run(cache: HTTPCache | None = None) -> str | None:
+    """Fetch, filter and render without judging or sending. Returns the HTML.
+
+    Markets are selected on price movement alone and rendered with their
+    descriptions, so neither the Groq nor the Resend SDK is imported.
+    """
+    set_stage("fetch")
+    store = HistoryStore()
+    all_markets = _fetch_all_markets(store, cache)
+    set_stage("filter")
+    filtered = filter_markets(all_markets)
+    set_stage("select")
+    annotate_movers(filtered, store)
+    top_movers = select_top_markets(filtered, target_total=10)
+    if not top_movers:
+        print("No markets passed filtering.", file=sys.stderr)
+        return None
+    set_stage("render")
+    payload = optimize_newsletter(top_movers, date_str=_date_str())
+    print(f"Payload: {payload.size} bytes ({', '.join(payload.steps)})", file=sys.stderr)
+    return payload.html
+
+
+def prepare(
+    groq_api_key: str,
+    cache: HTTPCache | None = None,
+    guard: RunGuard | None = None,
+) -> Issue | None:
+    """Run stages 1-5 and render. Returns the issue, or None if there's nothing to send."""
+    guard = guard or RunGuard()
+    try:
+        return _prepare(groq_api_key, cache, guard)
+    finally:
+        print(guard.summary())
+
+
+def _prepare(groq_api_key: str, cache: HTTPCache | None, guard: RunGuard) -> Issue | None:
+    # Stage 1: Fetch from all categories
+    set_stage("fetch")
+    store = HistoryStore()
+    all_markets = _fetch_all_markets(store, cache, guard)
 
     # Stage 2 & 3: Blocklist + volume filtering
+    set_stage("filter")
     filtered = filter_markets(all_markets)
 
     if not filtered:
         print("No markets passed filtering. Skipping send.")
-        return
+        return None
+
+    # Stage 4: Short worthy/not-worthy classification (limit API calls)
+    set_stage("classify")
+    judge_stats = JudgeStats()
+    judgments = JudgmentCache()
+    client = groq_client(groq_api_key)  # Shared by both passes
+    candidates = filtered[:50]  # Cap at 50 LLM calls
+    verdicts = _map_until_deadline(
+        lambda m: _classify(m, client, judge_stats, guard, judgments),
+        candidates,
+        guard.deadline,
+        lambda m: _fallback_verdict(m, guard, judgments),
+    )
+    worthy_markets = [m for m, worthy in zip(candidates, verdicts) if worthy]
 
-    # Stage 4: LLM judgment (limit API calls)
-    worthy_markets = []
-    for market in filtered[:50]:  # Cap at 50 LLM calls
-        result = judge_market(
-            question=market["question"],
-            category=market.get("category", "unknown"),
-            probability=_get_probability(market),
-            change=market.get("oneDayPriceChange", 0),
-            api_key=groq_api_key,
-        )
-        if result.worthy:
-            market["summary"] = result.summary
-            worthy_markets.append(market)
-
-    # Stage 5: Weighted selection
+    # Stage 5: Weighted selection, ranked on multi-horizon movement
+    set_stage("select")
+    annotate_movers(worthy_markets, store)
     top_movers = select_top_markets(worthy_markets, target_total=10)
 
     if not top_movers:
         print("No worthy markets found. Skipping send.")
-        return
+        return None
+
+    # Summaries are only generated for markets that made the cut
+    set_stage("summarize")
+    summaries = _map_until_deadline(
+        lambda m: _summarize(m, client, judge_stats, guard, judgments),
+        top_movers,
+        guard.deadline,
+        lambda m: _fallback_summary(m, guard, judgments),
+    )
+    for market, summary in zip(top_movers, summaries):
+        market["summary"] = summary
+    judgments.save()
+    print(
+        f"LLM parse failures: {judge_stats.parse_failures}/{judge_stats.calls} "
+        f"({judge_stats.parse_failure_rate:.0%}), unrecovered: {judge_stats.unrecovered}"
+    )
+    print(f"LLM escalations: {judge_stats.escalations}/{judge_stats.classifications} ({judge_stats.escalation_rate:.0%})")
+    for model, tier in judge_stats.tiers.items():
+        print(f"  {model}: {tier.calls} calls, {tier.mean_latency * 1000:.0f} ms avg")
 
-    # Stage 6: Render and send
-    date_str = datetime.now(timezone.utc).strftime("%b %-d, %Y")
-    subject = f"Top Movers — {date_str}"
-    html = render_newsletter(top_movers, date_str=date_str)
+    # Stage 6a: Render, shrinking the payload to stay under Gmail's clipping limit
+    set_stage("render")
+    date_str = _date_str()
+    payload = optimize_newsletter(top_movers, date_str=date_str)
+    print(f"Payload: {payload.size} bytes ({', '.join(payload.steps)})")
+    return Issue(
+        date_str=date_str,
+        subject=f"Top Movers — {date_str}",
+        html=payload.html,
+        markets=payload.markets,
+        created_at=time.time(),
+    )
+
+
+def deliver(
+    issue: Issue,
+    resend_api_key: str,
+    audience_id: str,
+    from_email: str,
+    deadline: Deadline | None = None,
+) -> None:
+    """Stage 6b: send a rendered issue to the audience, stopping at the deadline.
 
-    email_ids = send_newsletter(
-        html=html,
-        subject=subject,
+    Sent as one DeliveryScheduler window keyed on the issue's day, so sends
+    are paced under SEND_RATE and a rerun resumes after anyone already sent.
+    """
+    set_stage("send")
+    print(f"Payload per send: {len(issue.html.encode('utf-8'))} bytes")
+    day = datetime.fromtimestamp(issue.created_at, timezone.utc).date()
+    sent = deliver_now(
+        key=f"issue-{day.isoformat()}",
+        html=issue.html,
+        subject=issue.subject,
+        resend_api_key=resend_api_key,
         audience_id=audience_id,
         from_email=from_email,
-        api_key=resend_api_key,
+        deadline=deadline,
     )
-    print(f"Newsletter sent to {len(email_ids)} recipients.")
+    print(f"Newsletter sent to {sent} recipients.")
 
 
-if __name__ == "__main__":
-    run(
-        resend_api_key=os.environ["RESEND_API_KEY"],
-        audience_id=os.environ["RESEND_AUDIENCE_ID"],
-        from_email=os.environ.get("FROM_EMAIL", "Newsletter <newsletter@yourdomain.com>"),
-        groq_api_key=os.environ["GROQ_API_KEY"],
+def run(
+    resend_api_key: str,
+    audience_id: str,
+    from_email: str,
+    groq_api_key: str,
+    cache: HTTPCache | None = None,
+) -> None:
+    """Orchestrate the newsletter pipeline: fetch -> filter -> classify -> select -> summarize -> send."""
+    guard = RunGuard()
+    issue = prepare(groq_api_key, cache, guard)
+    if issue is not None:
+        deliver(issue, resend_api_key, audience_id, from_email, guard.send_deadline)
+
+
+def send(
+    resend_api_key: str,
+    audience_id: str,
+    from_email: str,
+    groq_api_key: str | None = None,
+    cache: HTTPCache | None = None,
+) -> None:
+    """Deliver today's prepared issue, preparing it inline if none is fresh."""
+    guard = RunGuard()
+    issue = load_fresh_issue()
+    if issue is None:
+        if not groq_api_key:
+            raise RuntimeError("No fresh prepared issue and no GROQ_API_KEY to prepare one")
+        print("No fresh prepared issue found. Preparing inline.")
+        issue = prepare(groq_api_key, cache, guard)
+        if issue is None:
+            return
+    deliver(issue, resend_api_key, audience_id, from_email, guard.send_deadline)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prediction market newsletter")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["run", "prepare", "send"],
+        default="run",
+        help="run: prepare and send now (default); prepare: write today's issue; "
+        "send: deliver today's prepared issue",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="fetch, filter and render only; print the HTML instead of sending",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always download Gamma responses instead of using the HTTP cache",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"sample stacks during the run; write per-stage collapsed stacks to "
+        f"{PROFILE_DIR} and print the hottest functions",
     )
+    args = parser.parse_args()
+    profiler = SamplingProfiler() if args.profile else None
+    try:
+        with profiler or nullcontext():
+            _dispatch(args)
+    finally:
+        if profiler is not None:
+            paths = profiler.write_collapsed()
+            print(profiler.format_report(), file=sys.stderr)
+            print(f"Collapsed stacks written to {os.path.dirname(paths[0])}", file=sys.stderr)
+
+
+def _dispatch(args: argparse.Namespace) -> None:
+    cache = None if args.no_cache else HTTPCache()
+
+    if args.dry_run:
+        html = dry_run(cache)
+        if html:
+            print(html)
+        return
+
+    if args.command == "prepare":
+        # Nothing is sent afterwards, so judging may use the whole run
+        issue = prepare(os.environ["GROQ_API_KEY"], cache, RunGuard(deadline=Deadline()))
+        if issue is not None:
+            print(f"Prepared issue written to {save_issue(issue)}")
+        return
+
+    delivery = {
+        "resend_api_key": os.environ["RESEND_API_KEY"],
+        "audience_id": os.environ["RESEND_AUDIENCE_ID"],
+        "from_email": os.environ.get("FROM_EMAIL", "Newsletter <newsletter@yourdomain.com>"),
+    }
+    try:
+        if args.command == "send":
+            send(**delivery, groq_api_key=os.environ.get("GROQ_API_KEY"), cache=cache)
+        else:
+            run(**delivery, groq_api_key=os.environ["GROQ_API_KEY"], cache=cache)
+    except DeliveryIncomplete as e:
+        # Non-zero so the workflow run fails visibly; a re-run resumes the send
+        raise SystemExit(f"Delivery incomplete: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""Local stand-ins for the Gamma, Groq and Resend APIs, for load testing.
+
+Start all three and point the pipeline at them:
+
+    python -m src.mock_servers --markets 10000 --recipients 100000 --latency 0.05
+
+then export the printed GAMMA_API_BASE, GROQ_BASE_URL and RESEND_API_URL
+before running ``python -m src.main``.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.polymarket import CATEGORY_TAGS
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.0  # Seconds added to every response
+    error_rate: float = 0.0  # Fraction of requests answered with a 500
+    rate_limit: float = 0.0  # Requests per second before answering 429, 0 disables
+    seed: int = 0
+
+
+class _RateLimiter:
+    """Token bucket shared by all handler threads of one server."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    """Shared latency, error and rate-limit behaviour for every mock API."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_error(self, status: int, name: str, message: str, headers: dict | None = None) -> None:
+        """Send an error body; subclasses override to match their API's error format."""
+        self._send_json(status, {"error": message}, headers)
+
+    def _degrade(self) -> bool:
+        """Apply configured latency and failures. Returns True if a response was sent."""
+        server = self.server
+        if server.config.latency:
+            time.sleep(server.config.latency)
+        if not server.limiter.allow():
+            self._send_error(429, "rate_limit_exceeded", "rate limited", {"Retry-After": "1"})
+            return True
+        with server.random_lock:
+            failed = server.random.random() < server.config.error_rate
+        if failed:
+            self._send_error(500, "application_error", "injected failure")
+            return True
+        return False
+
+    def do_GET(self):
+        if self._degrade():
+            return
+        url = urlparse(self.path)
+        self.handle_get(url.path, {k: v[0] for k, v in parse_qs(url.query).items()})
+
+    def do_POST(self):
+        if self._degrade():
+            return
+        self.handle_post(urlparse(self.path).path, self._read_json())
+
+    def handle_get(self, path: str, params: dict) -> None:
+        self._send_json(404, {"error": "not found"})
+
+    def handle_post(self, path: str, body) -> None:
+        self._send_json(404, {"error": "not found"})
+
+
+def _build_events(num_markets: int, markets_per_event: int = 4) -> dict[int, list[dict]]:
+    """Generate events grouped by tag_id, ordered by descending 24h volume."""
+    rng = random.Random(num_markets)
+    tag_ids = list(CATEGORY_TAGS.values())
+    events_by_tag: dict[int, list[dict]] = {tag_id: [] for tag_id in tag_ids}
+    for event_index in range(0, num_markets, markets_per_event):
+        tag_id = tag_ids[(event_index // markets_per_event) % len(tag_ids)]
+        markets = []
+        for market_index in range(event_index, min(event_index + markets_per_event, num_markets)):
+            price = rng.uniform(0.02, 0.98)
+            markets.append({
+                "id": str(market_index),
+                "question": f"Will mock outcome {market_index} happen?",
+                "slug": f"mock-market-{market_index}",
+                "description": f"This market resolves to Yes if mock outcome {market_index} happens.",
+                "outcomePrices": json.dumps([f"{price:.3f}", f"{1 - price:.3f}"]),
+                "volume24hr": rng.uniform(10_000, 5_000_000),
+                "oneDayPriceChange": rng.uniform(-0.3, 0.3),
+            })
+        events_by_tag[tag_id].append({
+            "id": str(event_index // markets_per_event),
+            "title": f"Mock event {event_index // markets_per_event}",
+            "volume24hr": sum(m["volume24hr"] for m in markets),
+            "markets": markets,
+        })
+    for events in events_by_tag.values():
+        events.sort(key=lambda e: e["volume24hr"], reverse=True)
+    return events_by_tag
+
+
+class GammaHandler(_MockHandler):
+    """Serves GET /events?tag_id=... and GET /markets."""
+
+    def handle_get(self, path: str, params: dict) -> None:
+        limit = int(params.get("limit", 20))
+        offset = int(params.get("offset", 0))
+        if path == "/events":
+            events = self.server.events_by_tag.get(int(params.get("tag_id", -1)), [])
+            self._send_json(200, events[offset:offset + limit])
+        elif path == "/markets":
+            markets = [
+                m for events in self.server.events_by_tag.values()
+                for e in events for m in e["markets"]
+            ]
+            markets.sort(key=lambda m: m["volume24hr"], reverse=True)
+            self._send_json(200, markets[offset:offset + limit])
+        else:
+            super().handle_get(path, params)
+
+
+class GroqHandler(_MockHandler):
+    """Serves POST /openai/v1/chat/completions with a canned JSON verdict."""
+
+    def handle_post(self, path: str, body) -> None:
+        if path != "/openai/v1/chat/completions":
+            return super().handle_post(path, body)
+        content = json.dumps({
+            "worthy": True,
+            "confidence": 0.9,
+            "summary": "Mock summary of why this market matters.",
+        })
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 30, "total_tokens": 130},
+        })
+
+
+class ResendHandler(_MockHandler):
+    """Serves GET /audiences/{id}/contacts and POST /emails."""
+
+    def _send_error(self, status: int, name: str, message: str, headers: dict | None = None) -> None:
+        # The Resend SDK only raises for error bodies carrying statusCode
+        self._send_json(status, {"statusCode": status, "name": name, "message": message}, headers)
+
+    def handle_get(self, path: str, params: dict) -> None:
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "audiences" and parts[2] == "contacts":
+            self._send_json(200, {"object": "list", "data": self.server.contacts})
+        else:
+            super().handle_get(path, params)
+
+    def handle_post(self, path: str, body) -> None:
+        if path != "/emails":
+            return super().handle_post(path, body)
+        with self.server.counter_lock:
+            self.server.emails_sent += 1
+        self._send_json(200, {"id": str(uuid.uuid4())})
+
+
+def _build_contacts(num_recipients: int) -> list[dict]:
+    return [
+        {
+            "id": str(i),
+            "email": f"user{i}@example.com",
+            "unsubscribed": i % 50 == 0,
+        }
+        for i in range(num_recipients)
+    ]
+
+
+def _start(handler: type[_MockHandler], config: MockConfig, port: int = 0, **state) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.config = config
+    server.limiter = _RateLimiter(config.rate_limit)
+    server.random = random.Random(config.seed)
+    server.random_lock = threading.Lock()
+    for name, value in state.items():
+        setattr(server, name, value)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return server
+
+
+def _url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+@dataclass
+class MockServers:
+    gamma: ThreadingHTTPServer
+    groq: ThreadingHTTPServer
+    resend: ThreadingHTTPServer
+
+    @property
+    def env(self) -> dict[str, str]:
+        """Environment overrides that point the pipeline at these servers."""
+        return {
+            "GAMMA_API_BASE": _url(self.gamma),
+            "GROQ_BASE_URL": _url(self.groq),
+            "RESEND_API_URL": _url(self.resend),
+        }
+
+    def shutdown(self) -> None:
+        for server in (self.gamma, self.groq, self.resend):
+            server.shutdown()
+            server.server_close()
+
+
+def start_mock_servers(
+    num_markets: int = 1000,
+    num_recipients: int = 1000,
+    config: MockConfig | None = None,
+    ports: tuple[int, int, int] = (0, 0, 0),
+) -> MockServers:
+    """Start Gamma, Groq and Resend stand-ins on localhost in background threads."""
+    config = config or MockConfig()
+    return MockServers(
+        gamma=_start(GammaHandler, config, ports[0], events_by_tag=_build_events(num_markets)),
+        groq=_start(GroqHandler, config, ports[1]),
+        resend=_start(
+            ResendHandler,
+            config,
+            ports[2],
+            contacts=_build_contacts(num_recipients),
+            emails_sent=0,
+            counter_lock=threading.Lock(),
+        ),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--markets", type=int, default=10_000)
+    parser.add_argument("--recipients", type=int, default=100_000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500s")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests/sec before 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ports", type=int, nargs=3, default=(8001, 8002, 8003))
+    args = parser.parse_args()
+
+    servers = start_mock_servers(
+        num_markets=args.markets,
+        num_recipients=args.recipients,
+        config=MockConfig(args.latency, args.error_rate, args.rate_limit, args.seed),
+        ports=tuple(args.ports),
+    )
+    for name, value in servers.env.items():
+        print(f"export {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servers.shutdown()
+
+
+if __name__ == "__main__":
+    main()
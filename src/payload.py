@@ -0,0 +1,113 @@
+"""Post-render size optimisation for the newsletter email.
+
+Gmail clips messages whose HTML exceeds roughly 102KB, hiding the tail of
+the issue (and the unsubscribe link) behind "View entire message". Each
+step below only runs while the payload is still over budget, cheapest and
+safest first.
+"""
+import re
+from dataclasses import dataclass, field
+
+from src.email_template import _truncate, render_newsletter
+
+GMAIL_CLIP_BYTES = 102 * 1024
+# Headroom for the per-recipient unsubscribe URL and anything the ESP injects
+PAYLOAD_BUDGET = 95 * 1024
+
+# Summary lengths tried, in order, before dropping rows
+SUMMARY_LIMITS = (240, 160, 100)
+
+_COMMENT = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_STYLE_ATTR = re.compile(r'style="([^"]*)"')
+_TAG_WITH_CLASS = re.compile(r'<[^>]*\bclass="[^"]*"[^>]*>')
+
+
+@dataclass
+class Payload:
+    html: str
+    markets: list[dict]
+    steps: list[str] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return len(self.html.encode("utf-8"))
+
+
+def _compact_style(style: str) -> str:
+    style = re.sub(r"\s*([:;,])\s*", r"\1", style.strip())
+    return style.rstrip(";")
+
+
+def minify_html(html: str) -> str:
+    """Drop comments and indentation, collapse whitespace and compact inline styles."""
+    html = _COMMENT.sub("", html)
+    html = re.sub(r"\s+", " ", html)
+    html = re.sub(r">\s+<", "><", html)
+    html = _STYLE_ATTR.sub(lambda m: f'style="{_compact_style(m.group(1))}"', html)
+    return html.strip()
+
+
+def dedupe_styles(html: str, min_count: int = 2) -> str:
+    """Move repeated inline styles into classes in a <style> block.
+
+    Gmail, Apple Mail, Outlook and Yahoo honour <style> in <head>, but some
+    clients (e.g. Gmail apps showing non-Gmail accounts) ignore it, so this
+    is only used when minification alone can't get under budget.
+    """
+    if "</head>" not in html or _TAG_WITH_CLASS.search(html):
+        return html
+
+    counts: dict[str, int] = {}
+    for style in _STYLE_ATTR.findall(html):
+        counts[style] = counts.get(style, 0) + 1
+
+    classes: dict[str, str] = {}
+    for style, count in sorted(counts.items(), key=lambda x: -x[1]):
+        # Only worth it when the class saves more than its CSS rule costs
+        if count >= min_count and (count - 1) * len(style) > 16:
+            classes[style] = f"s{len(classes)}"
+    if not classes:
+        return html
+
+    html = _STYLE_ATTR.sub(
+        lambda m: f'class="{classes[m.group(1)]}"' if m.group(1) in classes else m.group(0),
+        html,
+    )
+    rules = "".join(f".{name}{{{style}}}" for style, name in classes.items())
+    return html.replace("</head>", f"<style>{rules}</style></head>", 1)
+
+
+def _render(markets: list[dict], date_str: str, dedupe: bool) -> str:
+    html = minify_html(render_newsletter(markets, date_str=date_str))
+    return dedupe_styles(html) if dedupe else html
+
+
+def optimize_newsletter(
+    markets: list[dict],
+    date_str: str,
+    budget: int = PAYLOAD_BUDGET,
+) -> Payload:
+    """Render the newsletter as small as needed to fit in budget bytes."""
+    markets = [dict(m) for m in markets]
+    payload = Payload(_render(markets, date_str, dedupe=False), markets, ["minify"])
+    if payload.size <= budget:
+        return payload
+
+    payload.html = _render(markets, date_str, dedupe=True)
+    payload.steps.append("dedupe-styles")
+
+    for limit in SUMMARY_LIMITS:
+        if payload.size <= budget:
+            return payload
+        for market in markets:
+            if market.get("summary"):
+                market["summary"] = _truncate(market["summary"], limit)
+        payload.html = _render(markets, date_str, dedupe=True)
+        payload.steps.append(f"summaries<={limit}")
+
+    # Last resort: drop the lowest-ranked rows
+    while payload.size > budget and len(markets) > 1:
+        markets.pop()
+        payload.html = _render(markets, date_str, dedupe=True)
+        payload.steps.append("drop-row")
+    return payload
@@ -1,6 +1,19 @@
+import json
+import os
+import time
+
 import requests
 
-GAMMA_API_BASE = "https://gamma-api.polymarket.com"
+from src.atomic import atomic_write
+from src.http_cache import HTTPCache
+
+# Overridable so load tests can point at src.mock_servers
+GAMMA_API_BASE = os.environ.get("GAMMA_API_BASE", "https://gamma-api.polymarket.com")
+
+REQUEST_TIMEOUT = 10.0  # Seconds; requests has no default and can hang forever
+
+# Last successful fetch, used when Gamma is unavailable
+SNAPSHOT_PATH = os.environ.get("SNAPSHOT_PATH", "data/snapshot.json")
 
 CATEGORY_TAGS = {
     "politics": 2,
@@ -21,7 +34,21 @@ CATEGORY_WEIGHTS = {
 }
 
 
-def fetch_active_markets(limit: int = 100) -> list[dict]:
+def _get_json(
+    url: str,
+    params: dict,
+    cache: HTTPCache | None = None,
+    timeout: float = REQUEST_TIMEOUT,
+):
+    """GET a JSON payload, through the HTTP cache when one is given."""
+    if cache is not None:
+        return cache.get_json(url, params, timeout=timeout)
+    response = requests.get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_active_markets(limit: int = 100, cache: HTTPCache | None = None) -> list[dict]:
     """Fetch active markets from Polymarket's Gamma API, sorted by 24h volume."""
     url = f"{GAMMA_API_BASE}/markets"
     params = {
@@ -31,13 +58,20 @@ def fetch_active_markets(limit: int = 100) -> list[dict]:
         "order": "volume24hr",
         "ascending": "false",
     }
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    return response.json()
+    return _get_json(url, params, cache=cache)
 
 
-def fetch_events_by_category(category: str, limit: int = 20) -> list[dict]:
-    """Fetch markets from a category using Polymarket's Events API with tag_id."""
+def fetch_events_by_category(
+    category: str,
+    limit: int = 20,
+    cache: HTTPCache | None = None,
+    timeout: float = REQUEST_TIMEOUT,
+) -> list[dict]:
+    """Fetch markets from a category using Polymarket's Events API with tag_id.
+
+    With a cache, fresh responses are read from disk and stale ones are
+    revalidated with conditional requests.
+    """
     tag_id = CATEGORY_TAGS.get(category)
     if tag_id is None:
         return []
@@ -51,9 +85,7 @@ def fetch_events_by_category(category: str, limit: int = 20) -> list[dict]:
         "order": "volume24hr",
         "ascending": "false",
     }
-    response = requests.get(url, params=params)
-    response.raise_for_status()
-    events = response.json()
+    events = _get_json(url, params, cache=cache, timeout=timeout)
 
     # Flatten: extract markets from events, add category and event context
     markets = []
@@ -69,3 +101,19 @@ def fetch_events_by_category(category: str, limit: int = 20) -> list[dict]:
             markets.append(market)
 
     return markets
+
+
+def save_snapshot(markets: list[dict], path: str = SNAPSHOT_PATH) -> None:
+    """Persist a successful fetch so a later run can fall back to it."""
+    with atomic_write(path) as f:
+        json.dump({"saved_at": time.time(), "markets": markets}, f)
+
+
+def load_snapshot(path: str = SNAPSHOT_PATH) -> tuple[list[dict], float] | None:
+    """Return (markets, saved_at) from the last snapshot, or None if there isn't one."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return data["markets"], data["saved_at"]
+    except (OSError, ValueError, KeyError):
+        return None
@@ -0,0 +1,157 @@
+"""Low-overhead sampling profiler for pipeline runs (``python -m src.main --profile``).
+
+A background thread snapshots every thread's Python stack with
+``sys._current_frames()`` at a fixed interval and tags each sample with the
+pipeline stage set by ``set_stage``. Results are written as collapsed stacks
+(one ``frame;frame;frame count`` line per unique stack) that flamegraph.pl,
+speedscope and inferno read directly, one file per stage plus ``all.folded``.
+"""
+import concurrent.futures.thread
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "data/profile")
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", "0.005"))  # Seconds between samples
+
+# Leaf frames that mean a thread is parked (idle pool workers, the main thread
+# blocked on futures); dropped so they don't swamp the hot-function table
+_IDLE_FRAMES = {
+    (threading.__file__, "wait"),
+    (threading.__file__, "_wait_for_tstate_lock"),
+    (concurrent.futures.thread.__file__, "_worker"),  # Blocked in SimpleQueue.get
+}
+
+_active: "SamplingProfiler | None" = None
+
+
+def set_stage(name: str) -> None:
+    """Label subsequent samples with a pipeline stage; a no-op when not profiling."""
+    if _active is not None:
+        _active.stage = name
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    return (frame.f_code.co_filename, frame.f_code.co_name) in _IDLE_FRAMES
+
+
+class SamplingProfiler:
+    """Samples all threads' stacks while active; use as a context manager."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.stage = "startup"
+        # (stage, root-first stack) -> sample count
+        self.samples: Counter[tuple[str, tuple[str, ...]]] = Counter()
+        self.ticks = 0
+        self.overhead = 0.0  # Seconds the sampler spent walking stacks
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started = 0.0
+
+    def __enter__(self) -> "SamplingProfiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        global _active
+        _active = self
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        global _active
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+        if _active is self:
+            _active = None
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(skip=own)
+
+    def sample(self, skip: int | None = None) -> None:
+        """Record one stack per busy thread under the current stage."""
+        started = time.perf_counter()
+        stage = self.stage
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip or _is_idle(frame):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            self.samples[(stage, tuple(reversed(stack)))] += 1
+        self.ticks += 1
+        self.overhead += time.perf_counter() - started
+
+    def stages(self) -> dict[str, int]:
+        """Sample totals per stage, in the order stages were first seen."""
+        totals: dict[str, int] = {}
+        for (stage, _), count in self.samples.items():
+            totals[stage] = totals.get(stage, 0) + count
+        return totals
+
+    def collapsed(self, stage: str | None = None) -> str:
+        """Collapsed-stack text for one stage, or all stages rooted at their label."""
+        lines = []
+        for (sample_stage, stack), count in sorted(self.samples.items()):
+            if stage is None:
+                lines.append(f"{';'.join((sample_stage,) + stack)} {count}")
+            elif sample_stage == stage:
+                lines.append(f"{';'.join(stack)} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write_collapsed(self, directory: str = PROFILE_DIR) -> list[str]:
+        """Write <stage>.folded per stage plus all.folded; returns the paths."""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for stage in [*self.stages(), None]:
+            path = os.path.join(directory, f"{stage or 'all'}.folded")
+            with open(path, "w") as f:
+                f.write(self.collapsed(stage))
+            paths.append(path)
+        return paths
+
+    def hot_functions(self) -> list[tuple[str, int, int]]:
+        """(function, self samples, total samples) sorted by self samples."""
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for (_, stack), count in self.samples.items():
+            own[stack[-1]] += count
+            for label in set(stack):  # Recursion counts once per sample
+                total[label] += count
+        return sorted(((f, own[f], total[f]) for f in total), key=lambda x: (-x[1], -x[2], x[0]))
+
+    def format_report(self, top: int = 20) -> str:
+        """Render per-stage sample shares and the top-N functions by self time."""
+        total = sum(self.samples.values())
+        lines = [
+            f"Profile: {total} samples over {self.elapsed:.2f} s "
+            f"({self.ticks} ticks at {self.interval * 1000:.0f} ms, "
+            f"sampler overhead {self.overhead * 1000:.0f} ms)",
+            "",
+            "Per stage:",
+        ]
+        for stage, count in self.stages().items():
+            lines.append(f"  {count:6d}  {count / total:6.1%}  {stage}")
+
+        lines += ["", f"Top {top} functions (self / total samples):"]
+        for label, own, inclusive in self.hot_functions()[:top]:
+            lines.append(f"  {own:6d} {own / total:6.1%} / {inclusive:6d} {inclusive / total:6.1%}  {label}")
+        return "\n".join(lines)
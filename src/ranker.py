@@ -1,6 +1,7 @@
 import json
 
 from src.blocklist import is_blocklisted, passes_thresholds
+from src.diversity import DIVERSITY_WEIGHT, DiversityIndex, pick_diverse
 from src.polymarket import CATEGORY_WEIGHTS
 
 
@@ -33,8 +34,24 @@ def filter_markets(markets: list[dict]) -> list[dict]:
     return result[:5]
 
 
-def select_top_markets(markets: list[dict], target_total: int = 10) -> list[dict]:
-    """Select top markets from each category based on weights."""
+def _movement(market: dict) -> float:
+    """Ranking score: history-based mover_score when annotated, else 24h change."""
+    score = market.get("mover_score")
+    if score is not None:
+        return score
+    return abs(market.get("oneDayPriceChange", 0))
+
+
+def select_top_markets(
+    markets: list[dict],
+    target_total: int = 10,
+    diversity: float = DIVERSITY_WEIGHT,
+) -> list[dict]:
+    """Select top markets from each category based on weights.
+
+    With diversity > 0, picks are made by maximal marginal relevance so
+    near-duplicate questions from one storyline don't crowd out others.
+    """
     # Group by category
     by_category: dict[str, list[dict]] = {}
     for market in markets:
@@ -42,20 +59,30 @@ def select_top_markets(markets: list[dict], target_total: int = 10) -> list[dict
         if cat:
             by_category.setdefault(cat, []).append(market)
 
-    # Sort each category by absolute price change
+    # Sort each category by how much it moved
     for cat in by_category:
-        by_category[cat].sort(
-            key=lambda m: abs(m.get("oneDayPriceChange", 0)),
-            reverse=True,
-        )
+        by_category[cat].sort(key=_movement, reverse=True)
 
     # Calculate total weight for categories we have
     total_weight = sum(CATEGORY_WEIGHTS.get(cat, 0) for cat in by_category)
     if total_weight == 0:
         return []
 
-    # First pass: allocate based on weights
+    index = DiversityIndex(markets) if diversity > 0 else None
     selected: list[dict] = []
+
+    def take(cat: str, count: int) -> int:
+        pool = by_category[cat]
+        if index is None:
+            picked = pool[:count]
+        else:
+            picked = pick_diverse(pool, count, selected, index, _movement, diversity)
+        picked_ids = {id(m) for m in picked}
+        by_category[cat] = [m for m in pool if id(m) not in picked_ids]
+        selected.extend(picked)
+        return len(picked)
+
+    # First pass: allocate based on weights
     remaining_slots = target_total
 
     for cat, weight in sorted(CATEGORY_WEIGHTS.items(), key=lambda x: -x[1]):
@@ -63,11 +90,7 @@ def select_top_markets(markets: list[dict], target_total: int = 10) -> list[dict
             continue
 
         allocation = max(1, round((weight / total_weight) * target_total))
-        available = by_category[cat]
-        take = min(allocation, len(available), remaining_slots)
-
-        selected.extend(available[:take])
-        remaining_slots -= take
+        remaining_slots -= take(cat, min(allocation, remaining_slots))
 
     # Second pass: fill remaining slots
     if remaining_slots > 0:
@@ -75,13 +98,6 @@ def select_top_markets(markets: list[dict], target_total: int = 10) -> list[dict
             if cat not in by_category or remaining_slots <= 0:
                 continue
 
-            already_taken = sum(1 for m in selected if m.get("category") == cat)
-            available = by_category[cat][already_taken:]
-
-            for market in available:
-                if remaining_slots <= 0:
-                    break
-                selected.append(market)
-                remaining_slots -= 1
+            remaining_slots -= take(cat, remaining_slots)
 
     return selected[:target_total]
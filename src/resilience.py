@@ -0,0 +1,166 @@
+"""Circuit breakers, a run deadline and degraded-mode reporting.
+
+One breaker per upstream (Gamma, Groq). A call that raises or overruns the
+latency SLO counts as a failure; after `failure_threshold` consecutive
+failures the breaker opens and callers fall back immediately instead of
+waiting on a struggling service. After `reset_timeout` one trial call is
+let through (half-open) to see if the upstream has recovered.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+# Hard wall-clock budget for a whole run, in seconds
+RUN_DEADLINE = float(os.environ.get("RUN_DEADLINE", "900"))
+# Seconds of RUN_DEADLINE kept back for sending; fetch and judging stop this much earlier
+SEND_RESERVE = float(os.environ.get("SEND_RESERVE", "300"))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a request once the run deadline has passed."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        slo_seconds: float = 5.0,
+        reset_timeout: float = 60.0,
+        clock=time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slo_seconds = slo_seconds
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self.calls = 0
+        self.failures = 0
+        self.slo_breaches = 0
+        self.latencies: list[float] = []
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def _admit(self) -> None:
+        """Raise CircuitOpenError unless this caller may call the upstream."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def _record(self, latency: float, failed: bool) -> None:
+        with self._lock:
+            self._trial_in_flight = False
+            self.calls += 1
+            self.latencies.append(latency)
+            slow = latency > self.slo_seconds
+            self.slo_breaches += slow
+            if failed or slow:
+                self.failures += 1
+                self.consecutive_failures += 1
+                if self.consecutive_failures >= self.failure_threshold or self.opened_at is not None:
+                    # A failed half-open trial re-opens for another reset_timeout
+                    self.opened_at = self.clock()
+            else:
+                self.consecutive_failures = 0
+                self.opened_at = None
+
+    def call(self, fn, *args, **kwargs):
+        self._admit()
+        started = self.clock()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record(self.clock() - started, failed=True)
+            raise
+        self._record(self.clock() - started, failed=False)
+        return result
+
+    def summary(self) -> str:
+        if not self.latencies:
+            return f"{self.name}: no calls"
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return (
+            f"{self.name}: {self.state}, {self.calls} calls, {self.failures} failures, "
+            f"{self.slo_breaches} over {self.slo_seconds:.0f}s SLO, p95 {p95:.2f}s"
+        )
+
+
+class Deadline:
+    """Wall-clock budget shared by every stage of a run."""
+
+    def __init__(self, seconds: float = RUN_DEADLINE, clock=time.monotonic):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: float, attempts: int = 1) -> float:
+        """A per-attempt timeout such that `attempts` tries never outlive the deadline."""
+        return max(0.1, min(cap, self.remaining() / attempts))
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded("run deadline exceeded")
+
+
+@dataclass
+class RunReport:
+    """Degraded modes used during a run, for the end-of-run summary."""
+
+    degraded: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def note(self, mode: str) -> None:
+        with self._lock:
+            self.degraded[mode] = self.degraded.get(mode, 0) + 1
+
+    def __str__(self) -> str:
+        if not self.degraded:
+            return "Run report: all upstreams healthy"
+        modes = ", ".join(f"{mode} x{count}" for mode, count in sorted(self.degraded.items()))
+        return f"Run report: DEGRADED ({modes})"
+
+
+@dataclass
+class RunGuard:
+    """Breakers, deadlines and report shared by one pipeline run.
+
+    `deadline` bounds fetch and judging and passes SEND_RESERVE before
+    `send_deadline`, the end of the run, so slow upstreams can't eat the
+    time delivery needs.
+    """
+
+    gamma: CircuitBreaker = field(default_factory=lambda: CircuitBreaker("gamma", slo_seconds=5.0))
+    groq: CircuitBreaker = field(default_factory=lambda: CircuitBreaker("groq", slo_seconds=10.0))
+    deadline: Deadline = field(default_factory=lambda: Deadline(max(0.0, RUN_DEADLINE - SEND_RESERVE)))
+    send_deadline: Deadline = field(default_factory=Deadline)
+    report: RunReport = field(default_factory=RunReport)
+
+    def summary(self) -> str:
+        return "\n".join([self.gamma.summary(), self.groq.summary(), str(self.report)])
@@ -0,0 +1,293 @@
+"""Timezone-aware delivery of a prepared issue, paced under a global rate limit.
+
+    python -m src.scheduler
+
+Recipients are bucketed by timezone into send windows that open at the first
+DELIVERY_HOUR local time after the issue is ready, or straight away if that
+hour passed less than DELIVERY_GRACE ago. Windows sit in a heap keyed on due
+time; the worker sleeps until the next one is due and sends at most SEND_RATE
+emails per second, one window at a time across every worker. Progress is
+saved per window, so a restarted worker skips anyone already sent to.
+"""
+import fcntl
+import heapq
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+if __name__ == "__main__":
+    # Load .env before src modules read SEND_RATE, the delivery paths and the
+    # suppression file at import
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+from src.atomic import atomic_write
+from src.issue import Issue, load_fresh_issue
+from src.resilience import Deadline, DeadlineExceeded
+from src.sender import is_quota_exhausted, is_rate_limited, list_recipients, retry_after, send_email
+from src.suppression import SuppressionIndex
+
+DELIVERY_HOUR = 7  # Local time the newsletter should land
+DELIVERY_GRACE = 6 * 3600  # Seconds after DELIVERY_HOUR a late issue still goes out that day
+DEFAULT_TIMEZONE = "America/New_York"
+SEND_RATE = float(os.environ.get("SEND_RATE", "2"))  # Emails per second, Resend's default limit
+RATE_LIMIT_BACKOFF = 5.0  # Seconds to pause after a 429 without Retry-After, doubling per retry
+MAX_RATE_LIMIT_RETRIES = 5  # Consecutive 429s for one recipient before giving up
+CHECKPOINT_EVERY = 50  # Sends between progress writes
+
+# JSON object mapping email -> IANA timezone; anyone missing gets DEFAULT_TIMEZONE
+RECIPIENT_TIMEZONES_FILE = os.environ.get("RECIPIENT_TIMEZONES_FILE", "data/timezones.json")
+DELIVERY_STATE_DIR = os.environ.get("DELIVERY_STATE_DIR", "data/delivery")
+
+
+class DeliveryIncomplete(Exception):
+    """Sending stopped with recipients left; progress is saved for a rerun."""
+
+
+@dataclass(order=True)
+class SendWindow:
+    due: float
+    key: str = field(compare=False)
+    timezone: str = field(compare=False)
+    recipients: list[str] = field(compare=False, default_factory=list)
+
+
+def load_timezones(path: str = RECIPIENT_TIMEZONES_FILE) -> dict[str, str]:
+    try:
+        with open(path) as f:
+            return {email.lower(): tz for email, tz in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def _window_due(ready: float, tz_name: str, hour: int, grace: float = DELIVERY_GRACE) -> datetime:
+    """The first `hour`:00 local time in tz_name no more than `grace` before ready.
+
+    A morning that passed within the grace period is returned as is, so the
+    window is already due and sends as soon as the issue is ready.
+    """
+    tz = ZoneInfo(tz_name)
+    local_day = datetime.fromtimestamp(ready, tz).date()
+    due = datetime(local_day.year, local_day.month, local_day.day, hour, tzinfo=tz)
+    if due.timestamp() < ready - grace:
+        next_day = local_day + timedelta(days=1)
+        due = datetime(next_day.year, next_day.month, next_day.day, hour, tzinfo=tz)
+    return due
+
+
+def plan_windows(
+    recipients: list[str],
+    timezones: dict[str, str],
+    ready: float,
+    hour: int = DELIVERY_HOUR,
+    default_tz: str = DEFAULT_TIMEZONE,
+) -> list[SendWindow]:
+    """Group recipients into one window per timezone, due at the next `hour` local after `ready`.
+
+    Planning from the ready time rather than a calendar day means timezones
+    whose morning passed more than DELIVERY_GRACE ago get the following
+    morning; those only just past it are sent immediately.
+    """
+    windows: dict[str, SendWindow] = {}
+    for email in recipients:
+        tz_name = timezones.get(email.lower(), default_tz)
+        try:
+            due = _window_due(ready, tz_name, hour)
+        except ZoneInfoNotFoundError:
+            tz_name = default_tz
+            due = _window_due(ready, tz_name, hour)
+        window = windows.get(tz_name)
+        if window is None:
+            window = windows[tz_name] = SendWindow(
+                due=due.timestamp(),
+                key=f"{due.date().isoformat()}:{tz_name}",
+                timezone=tz_name,
+            )
+        window.recipients.append(email)
+    return sorted(windows.values())
+
+
+@contextmanager
+def _send_lock(path: str):
+    """Hold an exclusive lock on path, waiting for any other sender to finish."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class DeliveryScheduler:
+    """Drains send windows in due order under a global send rate.
+
+    Each window is sent holding a lock file beside the state file, so
+    overlapping workers (yesterday's still waiting on Asia, today's send,
+    the alert daemon) take turns rather than each sending at SEND_RATE.
+    """
+
+    def __init__(
+        self,
+        windows: list[SendWindow],
+        state_path: str,
+        rate: float = SEND_RATE,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        self.queue = list(windows)
+        heapq.heapify(self.queue)
+        self.state_path = state_path
+        self.lock_path = os.path.join(os.path.dirname(state_path), "send.lock")
+        self.interval = 1.0 / rate
+        self.clock = clock
+        self.sleep = sleep
+        self.progress: dict[str, list[str]] = {}  # Loaded per window, under the send lock
+        self._next_send = 0.0
+
+    def _load_progress(self) -> dict[str, list[str]]:
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_progress(self) -> None:
+        with atomic_write(self.state_path) as f:
+            json.dump(self.progress, f)
+
+    def _wait_until(self, ts: float) -> None:
+        delay = ts - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+    def _pace(self) -> None:
+        self._wait_until(self._next_send)
+        self._next_send = max(self.clock(), self._next_send) + self.interval
+
+    def _send_paced(self, send, recipient: str, deadline: Deadline | None) -> None:
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            self._pace()
+            if deadline is not None:
+                deadline.check()
+            try:
+                send(recipient)
+                return
+            except Exception as e:
+                if not is_rate_limited(e):
+                    raise
+                if is_quota_exhausted(e):
+                    raise DeliveryIncomplete(f"Resend quota exhausted ({e})") from e
+                error = e
+                self._next_send = self.clock() + (retry_after(e) or RATE_LIMIT_BACKOFF * 2 ** attempt)
+        raise DeliveryIncomplete(f"still rate limited after {MAX_RATE_LIMIT_RETRIES} retries") from error
+
+    def _unsent(self, window: SendWindow) -> int:
+        done = set(self.progress.get(window.key, ()))
+        return sum(r not in done for r in window.recipients)
+
+    def drain(self, send, deadline: Deadline | None = None) -> int:
+        """Send every window as it falls due. `send(recipient)` delivers one email.
+
+        Raises DeliveryIncomplete if the deadline passes, Resend's quota runs
+        out or 429s persist past MAX_RATE_LIMIT_RETRIES; a rerun resumes from
+        the saved progress.
+        """
+        total = 0
+        while self.queue:
+            window = heapq.heappop(self.queue)
+            self._wait_until(window.due)
+            with _send_lock(self.lock_path):
+                # Re-read under the lock in case another worker sent this window
+                self.progress = self._load_progress()
+                total += self._send_window(window, send, deadline)
+        return total
+
+    def _send_window(self, window: SendWindow, send, deadline: Deadline | None) -> int:
+        sent = self.progress.setdefault(window.key, [])
+        already = set(sent)
+        pending = [r for r in window.recipients if r not in already]
+        print(f"Window {window.key}: {len(pending)} to send, {len(already)} already sent")
+
+        try:
+            for recipient in pending:
+                try:
+                    self._send_paced(send, recipient, deadline)
+                except (DeliveryIncomplete, DeadlineExceeded) as e:
+                    unsent = self._unsent(window) + sum(self._unsent(w) for w in self.queue)
+                    raise DeliveryIncomplete(f"{e}; {unsent} recipients not sent") from e
+                sent.append(recipient)
+                if len(sent) % CHECKPOINT_EVERY == 0:
+                    self._save_progress()
+        finally:
+            # Persist even on failure so a restart resumes mid-window
+            self._save_progress()
+        return len(pending)
+
+def _deliverable_recipients(audience_id: str, resend_api_key: str) -> list[str]:
+    recipients, skipped = SuppressionIndex.load().filter(list_recipients(audience_id, resend_api_key))
+    print(f"Skipped {skipped} suppressed recipients.")
+    return recipients
+
+
+def deliver_now(
+    key: str,
+    html: str,
+    subject: str,
+    resend_api_key: str,
+    audience_id: str,
+    from_email: str,
+    keep_progress: bool = True,
+    deadline: Deadline | None = None,
+) -> int:
+    """Send to every subscriber immediately, paced under SEND_RATE, as one window.
+
+    Progress is kept under `key` so a retry resumes where a failed send
+    stopped; with keep_progress=False it is deleted once everyone is sent.
+    """
+    window = SendWindow(
+        due=time.time(),
+        key=key,
+        timezone="UTC",
+        recipients=_deliverable_recipients(audience_id, resend_api_key),
+    )
+    state_path = os.path.join(DELIVERY_STATE_DIR, f"{key}.json")
+    scheduler = DeliveryScheduler([window], state_path)
+    sent = scheduler.drain(lambda recipient: send_email(html, subject, from_email, recipient), deadline)
+    if not keep_progress:
+        os.remove(state_path)
+    return sent
+
+
+def deliver_scheduled(issue: Issue, resend_api_key: str, audience_id: str, from_email: str) -> int:
+    """Deliver an issue to every subscriber at DELIVERY_HOUR in their timezone."""
+    day = datetime.fromtimestamp(issue.created_at, timezone.utc).date()
+    recipients = _deliverable_recipients(audience_id, resend_api_key)
+    windows = plan_windows(recipients, load_timezones(), issue.created_at)
+    scheduler = DeliveryScheduler(windows, os.path.join(DELIVERY_STATE_DIR, f"{day.isoformat()}.json"))
+    return scheduler.drain(lambda recipient: send_email(issue.html, issue.subject, from_email, recipient))
+
+
+def main() -> None:
+    issue = load_fresh_issue(max_age=24 * 3600)
+    if issue is None:
+        raise SystemExit("No prepared issue for today. Run `python -m src.main prepare` first.")
+    try:
+        sent = deliver_scheduled(
+            issue,
+            resend_api_key=os.environ["RESEND_API_KEY"],
+            audience_id=os.environ["RESEND_AUDIENCE_ID"],
+            from_email=os.environ.get("FROM_EMAIL", "Newsletter <newsletter@yourdomain.com>"),
+        )
+    except DeliveryIncomplete as e:
+        raise SystemExit(f"Delivery incomplete: {e}")
+    print(f"Newsletter sent to {sent} recipients.")
+
+
+if __name__ == "__main__":
+    main()
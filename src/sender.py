@@ -1,25 +1,77 @@
-import resend
+import os
 
+from src.lazy import LazyImport
+from src.suppression import SuppressionIndex
 
-def send_newsletter(
-    html: str,
-    subject: str,
-    audience_id: str,
-    from_email: str,
-    api_key: str,
-) -> list[str]:
-    """Send newsletter to all contacts in an audience via direct email."""
+# Only loaded when the send stage runs
+resend = LazyImport("resend")
+
+RESEND_API_URL = os.environ.get("RESEND_API_URL", "https://api.resend.com")
+
+
+def list_recipients(audience_id: str, api_key: str) -> list[str]:
+    """Return the email addresses of all subscribed contacts in an audience."""
     resend.api_key = api_key
+    resend.api_url = RESEND_API_URL
 
     # Get all contacts from the audience
     contacts = resend.Contacts.list(audience_id=audience_id)
 
     # Filter to only subscribed contacts
-    recipients = [
+    return [
         c["email"] for c in contacts["data"]
         if not c.get("unsubscribed", False)
     ]
 
+
+def send_email(html: str, subject: str, from_email: str, recipient: str) -> str:
+    """Send one email. Assumes the API key was set by list_recipients."""
+    result = resend.Emails.send({
+        "from": from_email,
+        "to": [recipient],
+        "subject": subject,
+        "html": html,
+    })
+    return result["id"]
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True if a Resend error is a 429."""
+    return str(getattr(error, "code", "")) == "429"
+
+
+def is_quota_exhausted(error: Exception) -> bool:
+    """True if a 429 is Resend's daily or monthly quota, which retrying won't clear."""
+    return getattr(error, "error_type", "") in ("daily_quota_exceeded", "monthly_quota_exceeded")
+
+
+def retry_after(error: Exception) -> float | None:
+    """Seconds from a Retry-After header on the error, if it carries one.
+
+    resend 2.5 drops response headers, so this only applies to errors that
+    expose them; callers fall back to their own backoff.
+    """
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers["Retry-After"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def send_newsletter(
+    html: str,
+    subject: str,
+    audience_id: str,
+    from_email: str,
+    api_key: str,
+    suppression: SuppressionIndex | None = None,
+) -> list[str]:
+    """Send newsletter to all contacts in an audience via direct email."""
+    recipients = list_recipients(audience_id, api_key)
+    if suppression is not None:
+        recipients, skipped = suppression.filter(recipients)
+        print(f"Skipped {skipped} suppressed recipients.")
+
     if not recipients:
         print("No subscribed contacts in audience. Skipping send.")
         return []
@@ -27,13 +79,8 @@ def send_newsletter(
     # Send to each recipient
     email_ids = []
     for recipient in recipients:
-        result = resend.Emails.send({
-            "from": from_email,
-            "to": [recipient],
-            "subject": subject,
-            "html": html,
-        })
-        email_ids.append(result["id"])
-        print(f"Sent to {recipient}: {result['id']}")
+        email_id = send_email(html, subject, from_email, recipient)
+        email_ids.append(email_id)
+        print(f"Sent to {recipient}: {email_id}")
 
     return email_ids
@@ -0,0 +1,151 @@
+"""Local suppression list for bounced, complained and unsubscribed addresses.
+
+Addresses are stored as 64-bit BLAKE2b hashes of the normalised email, keyed
+with the SUPPRESSION_KEY secret, so the index is compact (8 bytes per entry on
+disk) and never holds plaintext. An unkeyed hash of an email address is easy
+to reverse by hashing candidate addresses, so the index is only committed
+(the scheduled workflow runs on a fresh checkout) because of the key: without
+it, the hashes can't be tested for membership. The file starts with a hash of
+a fixed string under the key, so loading with the wrong or a missing key
+fails instead of silently suppressing nobody.
+
+    python -m src.suppression ingest webhook-events.jsonl
+    python -m src.suppression add someone@example.com
+    python -m src.suppression stats
+"""
+import argparse
+import hashlib
+import json
+import os
+from array import array
+
+if __name__ == "__main__":
+    # Load .env before SUPPRESSION_KEY and SUPPRESSION_FILE are read below
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+from src.atomic import atomic_write
+
+SUPPRESSION_FILE = os.environ.get("SUPPRESSION_FILE", "data/suppression.bin")
+SUPPRESSION_KEY = os.environ.get("SUPPRESSION_KEY", "")  # Secret; at most 64 bytes
+_KEY_CHECK = "suppression-index-key-check"
+
+# Resend webhook event types that should stop future sends
+SUPPRESS_EVENTS = {"email.bounced", "email.complained"}
+
+
+def _hash(email: str, key: bytes) -> int:
+    digest = hashlib.blake2b(email.strip().lower().encode(), digest_size=8, key=key).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SuppressionIndex:
+    def __init__(self, hashes=(), key: str | None = None):
+        self.hashes: set[int] = set(hashes)
+        self.key = (SUPPRESSION_KEY if key is None else key).encode()
+
+    @classmethod
+    def load(cls, path: str = SUPPRESSION_FILE, key: str | None = None) -> "SuppressionIndex":
+        """Load the index from disk; a missing or empty file is an empty index."""
+        index = cls(key=key)
+        hashes = array("Q")
+        try:
+            with open(path, "rb") as f:
+                hashes.frombytes(f.read())
+        except OSError:
+            pass
+        if hashes:
+            if hashes[0] != _hash(_KEY_CHECK, index.key):
+                raise ValueError(f"SUPPRESSION_KEY does not match the key {path} was written with")
+            index.hashes.update(hashes[1:])
+        return index
+
+    def save(self, path: str = SUPPRESSION_FILE) -> None:
+        if not self.key:
+            raise ValueError("Set SUPPRESSION_KEY before saving; unkeyed hashes are not safe to commit")
+        with atomic_write(path, "wb") as f:
+            array("Q", [_hash(_KEY_CHECK, self.key), *sorted(self.hashes)]).tofile(f)
+
+    def add(self, email: str) -> bool:
+        """Suppress an address. Returns False if it was already suppressed."""
+        h = _hash(email, self.key)
+        if h in self.hashes:
+            return False
+        self.hashes.add(h)
+        return True
+
+    def __contains__(self, email: str) -> bool:
+        return _hash(email, self.key) in self.hashes
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def filter(self, recipients: list[str]) -> tuple[list[str], int]:
+        """Split recipients into those still sendable and a count of skipped ones."""
+        kept = [r for r in recipients if r not in self]
+        return kept, len(recipients) - len(kept)
+
+
+def _suppressed_addresses(event: dict) -> list[str]:
+    """Addresses a single Resend webhook event says we should stop mailing."""
+    event_type = event.get("type")
+    data = event.get("data") or {}
+
+    if event_type == "email.bounced":
+        bounce_type = (data.get("bounce") or {}).get("type")
+        if bounce_type and bounce_type.lower() != "permanent":
+            return []  # Soft bounce, worth retrying tomorrow
+    if event_type in SUPPRESS_EVENTS:
+        to = data.get("to") or []
+        return [to] if isinstance(to, str) else list(to)
+
+    if event_type in ("contact.created", "contact.updated") and data.get("unsubscribed"):
+        return [data["email"]] if data.get("email") else []
+    return []
+
+
+def ingest_events(index: SuppressionIndex, events) -> int:
+    """Add every suppressible address from Resend webhook events. Returns new entries."""
+    added = 0
+    for event in events:
+        for email in _suppressed_addresses(event):
+            added += index.add(email)
+    return added
+
+
+def _read_events(path: str):
+    """Read webhook events from a JSON array file or JSON Lines."""
+    with open(path) as f:
+        text = f.read()
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return json.loads(stripped)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the local suppression index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="import Resend webhook events (JSON or JSON Lines)")
+    ingest.add_argument("paths", nargs="+")
+    add = sub.add_parser("add", help="suppress addresses directly")
+    add.add_argument("emails", nargs="+")
+    sub.add_parser("stats", help="print the number of suppressed addresses")
+    args = parser.parse_args()
+
+    index = SuppressionIndex.load()
+    if args.command == "ingest":
+        added = sum(ingest_events(index, _read_events(path)) for path in args.paths)
+        index.save()
+        print(f"Added {added} addresses; {len(index)} suppressed in total.")
+    elif args.command == "add":
+        added = sum(index.add(email) for email in args.emails)
+        index.save()
+        print(f"Added {added} addresses; {len(index)} suppressed in total.")
+    else:
+        print(f"{len(index)} suppressed addresses.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import pytest
+
+from src.atomic import atomic_write
+
+
+def test_atomic_write_creates_parents_and_replaces(tmp_path):
+    path = tmp_path / "nested" / "state.json"
+
+    with atomic_write(str(path)) as f:
+        f.write("first")
+    with atomic_write(str(path)) as f:
+        f.write("second")
+
+    assert path.read_text() == "second"
+    assert not (tmp_path / "nested" / "state.json.tmp").exists()
+
+
+def test_atomic_write_leaves_original_on_error(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("original")
+
+    with pytest.raises(ValueError):
+        with atomic_write(str(path)) as f:
+            f.write("partial")
+            raise ValueError("serialisation failed")
+
+    assert path.read_text() == "original"
+    assert not (tmp_path / "state.json.tmp").exists()
@@ -0,0 +1,39 @@
+from src.bench import BenchResult, compare, load_baselines, make_markets, run_benchmark, save_baselines
+
+
+def test_make_markets_is_deterministic_and_renderable():
+    markets = make_markets(20)
+
+    assert markets == make_markets(20)
+    assert {"question", "slug", "outcomePrices", "oneDayPriceChange", "category"} <= set(markets[0])
+
+
+def test_run_benchmark_scales_the_base_input():
+    result = run_benchmark("render_newsletter", scale=1, repeat=1)
+
+    assert result.key == "render_newsletter@1x"
+    assert result.size == 10
+    assert result.seconds > 0
+
+
+def test_compare_flags_regressions_over_threshold():
+    results = [
+        BenchResult("filter_markets", 10, 1200, seconds=0.004),
+        BenchResult("is_blocklisted", 10, 1200, seconds=0.010),
+        BenchResult("render_newsletter", 10, 100, seconds=0.001),
+    ]
+    baselines = {"filter_markets@10x": 0.005, "is_blocklisted@10x": 0.005}
+
+    table, regressions = compare(results, baselines, threshold=1.5)
+
+    assert regressions == ["is_blocklisted@10x"]
+    assert "2.00x  REGRESSION" in table
+    assert "render_newsletter@10x" in table
+
+
+def test_save_baselines_merges_existing_entries(tmp_path):
+    path = str(tmp_path / "baselines.json")
+    save_baselines([BenchResult("filter_markets", 10, 1200, seconds=0.005)], path)
+    save_baselines([BenchResult("filter_markets", 100, 12000, seconds=0.05)], path)
+
+    assert load_baselines(path) == {"filter_markets@10x": 0.005, "filter_markets@100x": 0.05}
@@ -0,0 +1,137 @@
+from unittest.mock import patch
+
+from src.daemon import Alert, AlertLimiter, MoverMonitor, alert_key, poll_once, run_daemon
+from src.history import HistoryStore
+
+
+def test_monitor_alerts_once_when_move_crosses_threshold():
+    monitor = MoverMonitor(threshold=0.10, window=900, poll_interval=300, cooldown=0)
+
+    changes = [monitor.update("m1", price, now=i * 300) for i, price in enumerate([0.50, 0.55, 0.62, 0.64])]
+
+    assert changes[:2] == [None, None]
+    assert abs(changes[2] - 0.12) < 1e-9
+    # Still past the threshold, but already alerted for this move
+    assert changes[3] is None
+
+
+def test_monitor_window_is_bounded():
+    monitor = MoverMonitor(threshold=0.10, window=600, poll_interval=300)
+
+    # A slow drift never crosses the threshold within any 10-minute window
+    for i in range(100):
+        assert monitor.update("m1", 0.30 + i * 0.01, now=i * 300) is None
+
+    assert len(monitor.markets["m1"].prices) == 3
+
+
+def test_monitor_rearms_after_move_reverts_and_respects_cooldown():
+    monitor = MoverMonitor(threshold=0.10, window=300, poll_interval=300, cooldown=3600)
+
+    assert monitor.update("m1", 0.50, now=0) is None
+    assert monitor.update("m1", 0.65, now=300) is not None
+    assert monitor.update("m1", 0.66, now=600) is None  # Re-armed, but flat
+    assert monitor.update("m1", 0.80, now=900) is None  # Crossed again inside cooldown
+    monitor.update("m1", 0.80, now=1200)
+    assert monitor.update("m1", 0.95, now=4800) is not None
+
+
+def test_monitor_evicts_markets_that_stop_appearing():
+    monitor = MoverMonitor(evict_after=2)
+    monitor.begin_poll()
+    monitor.update("m1", 0.5, now=0)
+    monitor.begin_poll()
+    monitor.begin_poll()
+
+    assert monitor.evict_stale() == 1
+    assert monitor.markets == {}
+
+
+def test_alert_limiter_caps_alerts_per_period():
+    limiter = AlertLimiter(max_alerts=2, period=100)
+
+    assert limiter.allow(0)
+    assert limiter.allow(10)
+    assert not limiter.allow(50)
+    assert limiter.allow(101)
+
+
+def test_poll_once_fetches_through_cache_and_skips_minor_markets():
+    markets = [
+        {"id": "1", "question": "Will the Fed cut rates?", "outcomePrices": '["0.5", "0.5"]', "volume24hr": 5_000_000},
+        {"id": "2", "question": "Small market", "outcomePrices": '["0.5", "0.5"]', "volume24hr": 10},
+    ]
+    monitor = MoverMonitor()
+    cache = object()
+
+    with patch("src.daemon.fetch_events_by_category", return_value=markets) as mock_fetch:
+        poll_once(monitor, now=0, cache=cache)
+
+    assert mock_fetch.call_args[1]["cache"] is cache
+    assert set(monitor.markets) == {"1"}
+
+
+def test_poll_once_records_every_fetched_market_in_history(tmp_path):
+    markets = [
+        {"id": "1", "question": "Will the Fed cut rates?", "outcomePrices": '["0.5", "0.5"]', "volume24hr": 5_000_000},
+        {"id": "2", "question": "Small market", "outcomePrices": '["0.5", "0.5"]', "volume24hr": 10},
+    ]
+    store = HistoryStore(str(tmp_path))
+
+    with patch("src.daemon.fetch_events_by_category", return_value=markets):
+        poll_once(MoverMonitor(), now=0, store=store)
+        poll_once(MoverMonitor(), now=3600, store=store)
+
+    assert store.mover_stats("2", now=3600).deltas == {"1h": 0.0}
+
+
+def test_run_daemon_survives_a_failed_alert_send(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    market = {"id": "1", "question": "Will the Fed cut rates?", "outcomePrices": '["0.7", "0.3"]', "slug": "fed"}
+    alerts = [Alert(market=market, change=0.2), Alert(market={**market, "id": "2"}, change=-0.2)]
+
+    with patch("src.daemon.poll_once", return_value=alerts), \
+         patch("src.daemon.deliver_now", side_effect=[RuntimeError("429 rate limited"), 5]) as mock_deliver:
+        run_daemon("re_key", "aud-1", "news@example.com", max_polls=1)
+
+    assert mock_deliver.call_count == 2
+    assert mock_deliver.call_args_list[0][1]["key"].startswith("alert-1-")
+    assert mock_deliver.call_args_list[0][1]["keep_progress"] is False
+    out = capsys.readouterr().out
+    assert "Alert send failed" in out
+    assert "Alert sent to 5 recipients" in out
+
+
+def test_alert_key_is_stable_within_a_cooldown_period():
+    assert alert_key("1", 100, cooldown=3600) == alert_key("1", 3500, cooldown=3600)
+    assert alert_key("1", 100, cooldown=3600) != alert_key("1", 3700, cooldown=3600)
+    assert alert_key("1", 100, cooldown=3600) != alert_key("2", 100, cooldown=3600)
+
+
+def test_run_daemon_keeps_polling_while_an_alert_sends(tmp_path, monkeypatch):
+    import threading
+
+    monkeypatch.chdir(tmp_path)
+    market = {"id": "1", "question": "Will the Fed cut rates?", "outcomePrices": '["0.7", "0.3"]', "slug": "fed"}
+    release = threading.Event()
+    polls = []
+
+    def slow_send(**kwargs):
+        # Blocks until the loop has polled again, which it can only do if
+        # the send runs off the polling thread
+        assert release.wait(timeout=5)
+        return 1
+
+    def poll(*args, **kwargs):
+        polls.append(1)
+        if len(polls) == 2:
+            release.set()
+        return [Alert(market=market, change=0.2)] if len(polls) == 1 else []
+
+    with patch("src.daemon.poll_once", side_effect=poll), \
+         patch("src.daemon.deliver_now", side_effect=slow_send) as mock_deliver, \
+         patch("src.daemon.time.sleep"):
+        run_daemon("re_key", "aud-1", "news@example.com", poll_interval=1, max_polls=2)
+
+    assert len(polls) == 2
+    mock_deliver.assert_called_once()
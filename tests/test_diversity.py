@@ -0,0 +1,42 @@
+from src.diversity import DiversityIndex, minhash, pick_diverse, _tokens
+
+
+def _market(question, event_title="", change=0.1):
+    return {"question": question, "event_title": event_title, "oneDayPriceChange": change}
+
+
+def test_minhash_is_deterministic_and_order_independent():
+    assert minhash({"fed", "cut", "rates"}) == minhash({"rates", "cut", "fed"})
+
+
+def test_index_scores_near_duplicates_and_ignores_unrelated():
+    a = _market("Will Trump win Pennsylvania in the 2028 presidential election?", "Presidential Election Winner by State")
+    b = _market("Will Trump win Michigan in the 2028 presidential election?", "Presidential Election Winner by State")
+    c = _market("Will the Fed cut interest rates in March?", "Fed Decision in March")
+    index = DiversityIndex([a, b, c])
+
+    assert index.similarity(a, b) > 0.5
+    assert index.similarity(a, c) == 0.0
+
+
+def test_tokens_drop_stopwords():
+    assert _tokens(_market("Will the Fed cut rates?")) == {"fed", "cut", "rates"}
+
+
+def test_pick_diverse_skips_near_duplicate_of_selected():
+    a = _market("Will Trump win Pennsylvania in the 2028 presidential election?", "Presidential Election Winner by State", 0.30)
+    b = _market("Will Trump win Michigan in the 2028 presidential election?", "Presidential Election Winner by State", 0.28)
+    c = _market("Will the Fed cut interest rates in March?", "Fed Decision in March", 0.20)
+    index = DiversityIndex([a, b, c])
+
+    picked = pick_diverse([a, b, c], 2, [], index, relevance=lambda m: m["oneDayPriceChange"])
+
+    assert picked == [a, c]
+
+
+def test_index_builds_over_thousands_of_candidates():
+    markets = [_market(f"Will candidate {i} win district {i % 97}?", f"Race {i % 500}") for i in range(3000)]
+
+    index = DiversityIndex(markets)
+
+    assert len(index.signatures) == 3000
@@ -0,0 +1,86 @@
+from src.history import HistoryStore, annotate_movers, FALLBACK_DAILY_VOLATILITY
+
+NOW = 1_800_000_000.0
+
+
+def _fill(store, market_id, prices, step=3600):
+    start = NOW - step * (len(prices) - 1)
+    for i, price in enumerate(prices):
+        store.append(market_id, start + i * step, price, 1_000_000.0)
+
+
+def test_append_markets_writes_one_sample_per_market(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    markets = [
+        {"id": "1", "outcomePrices": '["0.40", "0.60"]', "volume24hr": 500000.0},
+        {"id": "2", "outcomePrices": ["0.70", "0.30"], "volume24hr": 100.0},
+        {"question": "No id"},
+    ]
+
+    assert store.append_markets(markets, timestamp=NOW) == 2
+    assert (tmp_path / "1.bin").stat().st_size == 24
+
+
+def test_mover_stats_computes_deltas_per_horizon(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    # Hourly samples for 8 days, flat with small noise, then a jump in the last hour
+    prices = [0.50 + (0.01 if i % 2 else -0.01) for i in range(8 * 24)] + [0.70]
+    _fill(store, "1", prices)
+
+    stats = store.mover_stats("1", now=NOW)
+
+    assert set(stats.deltas) == {"1h", "6h", "24h", "7d"}
+    assert abs(stats.deltas["1h"] - 0.19) < 1e-9
+    assert stats.zscores["1h"] > stats.zscores["24h"] > 0
+    assert stats.score == abs(stats.zscores["1h"])
+
+
+def test_mover_stats_skips_horizons_without_recent_enough_samples(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    # Daily samples only: nothing says how the price moved over the last hour
+    _fill(store, "1", [0.50, 0.52, 0.50, 0.68], step=24 * 3600)
+
+    stats = store.mover_stats("1", now=NOW)
+
+    assert set(stats.deltas) == {"24h"}
+    assert abs(stats.deltas["24h"] - 0.18) < 1e-9
+    assert set(stats.zscores) == {"24h"}
+
+
+def test_mover_stats_tolerates_cron_jitter_either_side(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    day = 24 * 3600
+    store.append("1", NOW - 2 * day, 0.30, 1_000_000.0)
+    store.append("1", NOW - day + 90, 0.50, 1_000_000.0)
+    store.append("1", NOW + 30, 0.60, 1_000_000.0)
+
+    stats = store.mover_stats("1", now=NOW + 30)
+
+    # The run a day and 60s earlier, not the two-day-old sample
+    assert set(stats.deltas) == {"24h"}
+    assert abs(stats.deltas["24h"] - 0.10) < 1e-9
+
+
+def test_mover_stats_ignores_samples_after_now(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    _fill(store, "1", [0.5, 0.5, 0.9])
+
+    stats = store.mover_stats("1", now=NOW - 3600)
+
+    assert stats.deltas["1h"] == 0.0
+
+
+def test_mover_stats_empty_without_history(tmp_path):
+    stats = HistoryStore(str(tmp_path)).mover_stats("missing", now=NOW)
+
+    assert stats.deltas == {}
+    assert stats.score is None
+
+
+def test_annotate_movers_falls_back_to_one_day_change(tmp_path):
+    markets = [{"id": "1", "oneDayPriceChange": -0.10}]
+
+    annotate_movers(markets, HistoryStore(str(tmp_path)), now=NOW)
+
+    assert markets[0]["mover_score"] == 0.10 / FALLBACK_DAILY_VOLATILITY
+    assert markets[0]["price_deltas"] == {}
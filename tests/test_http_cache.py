@@ -0,0 +1,68 @@
+from unittest.mock import Mock, patch
+
+from src.http_cache import HTTPCache
+
+URL = "https://gamma-api.polymarket.com/events"
+
+
+def _response(status_code=200, payload=None, headers=None):
+    response = Mock(status_code=status_code, headers=headers or {})
+    response.json.return_value = payload
+    return response
+
+
+def test_fresh_entry_is_served_without_request(tmp_path):
+    cache = HTTPCache(root=str(tmp_path), max_age=300)
+
+    with patch("src.http_cache.requests.get", return_value=_response(payload=[1, 2])) as mock_get:
+        cache.get_json(URL, {"tag_id": 2})
+        assert cache.get_json(URL, {"tag_id": 2}) == [1, 2]
+
+    mock_get.assert_called_once()
+    assert mock_get.call_args[1]["headers"]["Accept-Encoding"] == "gzip, deflate"
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_stale_entry_is_revalidated_with_etag(tmp_path):
+    cache = HTTPCache(root=str(tmp_path), max_age=0)
+    first = _response(payload={"v": 1}, headers={"ETag": '"abc"', "Last-Modified": "Mon, 19 Oct 2026 12:00:00 GMT"})
+
+    with patch("src.http_cache.requests.get", side_effect=[first, _response(status_code=304)]) as mock_get:
+        cache.get_json(URL, {"tag_id": 2})
+        payload = cache.get_json(URL, {"tag_id": 2})
+
+    headers = mock_get.call_args[1]["headers"]
+    assert headers["If-None-Match"] == '"abc"'
+    assert headers["If-Modified-Since"] == "Mon, 19 Oct 2026 12:00:00 GMT"
+    assert payload == {"v": 1}
+    assert cache.stats.revalidated == 1
+
+
+def test_cache_persists_across_instances(tmp_path):
+    with patch("src.http_cache.requests.get", return_value=_response(payload=["x"])):
+        HTTPCache(root=str(tmp_path), max_age=300).get_json(URL, {"tag_id": 2})
+
+    with patch("src.http_cache.requests.get") as mock_get:
+        cache = HTTPCache(root=str(tmp_path), max_age=300)
+        assert cache.get_json(URL, {"tag_id": 2}) == ["x"]
+
+    mock_get.assert_not_called()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = HTTPCache(root=str(tmp_path), max_age=300)
+    clock = iter(range(100))
+
+    with patch("src.http_cache.time.time", side_effect=lambda: next(clock)):
+        with patch("src.http_cache.requests.get", return_value=_response(payload=["x" * 100])):
+            cache.get_json(URL, {"tag_id": 1})
+            entry_size = next(iter(cache._index.values()))["size"]
+            cache.max_bytes = entry_size * 2
+            cache.get_json(URL, {"tag_id": 2})
+            cache.get_json(URL, {"tag_id": 1})  # Touch 1 so 2 is least recently used
+            cache.get_json(URL, {"tag_id": 3})
+
+    assert cache._key(URL, {"tag_id": 2}) not in cache._index
+    assert cache._key(URL, {"tag_id": 1}) in cache._index
+    assert len(list(tmp_path.glob("*.json.gz"))) == 2
@@ -0,0 +1,25 @@
+from src.importtime import format_report, parse_importtime
+
+SAMPLE_STDERR = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      3000 |       5000 |     requests.adapters
+import time:      2000 |       7000 |   requests
+import time:       500 |       7500 | src.main
+"""
+
+
+def test_parse_importtime_reads_rows_and_depth():
+    timings = parse_importtime(SAMPLE_STDERR)
+
+    assert [t.module for t in timings] == ["_io", "requests.adapters", "requests", "src.main"]
+    assert timings[1].self_us == 3000
+    assert timings[1].cumulative_us == 5000
+    assert timings[1].depth == 2
+    assert timings[3].depth == 0
+
+
+def test_format_report_groups_by_package():
+    report = format_report(parse_importtime(SAMPLE_STDERR))
+
+    assert "Total import time: 5.6 ms" in report
+    assert "5.0 ms  requests" in report
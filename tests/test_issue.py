@@ -0,0 +1,45 @@
+import json
+
+from src.issue import ISSUE_VERSION, Issue, load_fresh_issue, save_issue
+
+NOW = 1_800_000_000.0  # 2027-01-15 08:00 UTC
+
+
+def _issue(created_at=NOW):
+    return Issue(
+        date_str="Jan 15, 2027",
+        subject="Top Movers — Jan 15, 2027",
+        html="<html>",
+        markets=[{"question": "Will X happen?", "summary": "Because."}],
+        created_at=created_at,
+    )
+
+
+def test_saved_issue_round_trips(tmp_path):
+    path = save_issue(_issue(), root=str(tmp_path))
+
+    loaded = load_fresh_issue(root=str(tmp_path), now=NOW + 60)
+
+    assert path.endswith("issue-2027-01-15.json")
+    assert loaded == _issue()
+
+
+def test_stale_issue_is_ignored(tmp_path):
+    save_issue(_issue(), root=str(tmp_path))
+
+    assert load_fresh_issue(root=str(tmp_path), max_age=3600, now=NOW + 7200) is None
+
+
+def test_issue_from_another_version_is_ignored(tmp_path):
+    path = save_issue(_issue(), root=str(tmp_path))
+    with open(path) as f:
+        data = json.load(f)
+    data["version"] = ISSUE_VERSION + 1
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+    assert load_fresh_issue(root=str(tmp_path), now=NOW) is None
+
+
+def test_missing_issue_returns_none(tmp_path):
+    assert load_fresh_issue(root=str(tmp_path), now=NOW) is None
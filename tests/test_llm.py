@@ -1,6 +1,9 @@
 from unittest.mock import Mock, patch
 
-from src.llm import judge_market, LLMResult
+import pytest
+
+from src.llm import classify_market, judge_market, summarize_market, JudgeStats, JudgmentCache, LLMResult, _extract_json, _parse_models
+from src.resilience import CircuitBreaker, Deadline, DeadlineExceeded
 
 
 def test_judge_market_parses_worthy_response():
@@ -70,3 +73,294 @@ def test_judge_market_handles_malformed_json():
 
         assert result.worthy is False
         assert result.summary is None
+
+
+def _mock_groq_client(*contents):
+    mock_client = Mock()
+    mock_client.chat.completions.create.side_effect = [
+        Mock(choices=[Mock(message=Mock(content=c))]) for c in contents
+    ]
+    return mock_client
+
+
+def test_judge_market_extracts_json_from_code_fence():
+    content = 'Sure! Here you go:\n```json\n{"worthy": "true", "summary": "Odds shifted."}\n```'
+
+    with patch("src.llm.Groq") as mock_groq:
+        mock_groq.return_value = _mock_groq_client(content)
+        stats = JudgeStats()
+
+        result = judge_market(
+            question="Will the Fed cut rates?",
+            category="economy",
+            probability=0.73,
+            change=0.22,
+            api_key="test_key",
+            stats=stats,
+        )
+
+    assert result.worthy is True
+    assert result.summary == "Odds shifted."
+    assert stats.parse_failures == 0
+
+
+def test_judge_market_retries_with_strict_prompt_after_parse_failure():
+    with patch("src.llm.Groq") as mock_groq:
+        mock_client = _mock_groq_client("no idea", '{"worthy": true, "summary": "Recovered."}')
+        mock_groq.return_value = mock_client
+        stats = JudgeStats()
+
+        result = judge_market(
+            question="Will the Fed cut rates?",
+            category="economy",
+            probability=0.73,
+            change=0.22,
+            api_key="test_key",
+            stats=stats,
+        )
+
+    assert result.worthy is True
+    assert result.summary == "Recovered."
+    assert mock_client.chat.completions.create.call_count == 2
+    retry_prompt = mock_client.chat.completions.create.call_args[1]["messages"][1]["content"]
+    assert "exactly one JSON object" in retry_prompt
+    assert stats.calls == 1
+    assert stats.parse_failures == 1
+    assert stats.unrecovered == 0
+
+
+def test_judge_market_requests_json_mode():
+    with patch("src.llm.Groq") as mock_groq:
+        mock_client = _mock_groq_client('{"worthy": false, "summary": null}')
+        mock_groq.return_value = mock_client
+
+        judge_market(
+            question="Test question",
+            category="politics",
+            probability=0.50,
+            change=0.10,
+            api_key="test_key",
+        )
+
+    call_kwargs = mock_client.chat.completions.create.call_args[1]
+    assert call_kwargs["response_format"] == {"type": "json_object"}
+
+
+def test_extract_json_skips_unbalanced_braces():
+    assert _extract_json('{oops} then {"worthy": false}') == {"worthy": False}
+    assert _extract_json("nothing here") is None
+
+
+def test_classify_market_uses_short_completion():
+    with patch("src.llm.Groq") as mock_groq:
+        mock_client = _mock_groq_client('{"worthy": true, "confidence": 0.9}')
+        mock_groq.return_value = mock_client
+
+        worthy = classify_market(
+            question="Will the Fed cut rates?",
+            category="economy",
+            probability=0.73,
+            change=0.22,
+            api_key="test_key",
+        )
+
+    assert worthy is True
+    assert mock_client.chat.completions.create.call_args[1]["max_tokens"] < 50
+
+
+def test_summarize_market_returns_summary_or_none():
+    with patch("src.llm.Groq") as mock_groq:
+        mock_groq.return_value = _mock_groq_client('{"summary": "Markets now expect a cut."}')
+        summary = summarize_market(
+            question="Will the Fed cut rates?",
+            category="economy",
+            probability=0.73,
+            change=0.22,
+            api_key="test_key",
+        )
+
+    assert summary == "Markets now expect a cut."
+
+    with patch("src.llm.Groq") as mock_groq:
+        mock_groq.return_value = _mock_groq_client('{"summary": null}', '{"summary": ""}')
+        stats = JudgeStats()
+        summary = summarize_market(
+            question="Will the Fed cut rates?",
+            category="economy",
+            probability=0.73,
+            change=0.22,
+            api_key="test_key",
+            stats=stats,
+        )
+
+    assert summary is None
+    assert stats.unrecovered == 1
+
+
+def test_classify_market_escalates_low_confidence_verdicts():
+    with patch("src.llm.Groq") as mock_groq, patch("src.llm.MODEL_CASCADE", ["small", "large"]):
+        mock_client = _mock_groq_client(
+            '{"worthy": true, "confidence": 0.4}',
+            '{"worthy": false, "confidence": 0.95}',
+        )
+        mock_groq.return_value = mock_client
+        stats = JudgeStats()
+
+        worthy = classify_market(
+            question="Will the Fed cut rates?",
+            category="economy",
+            probability=0.73,
+            change=0.22,
+            api_key="test_key",
+            stats=stats,
+        )
+
+    assert worthy is False
+    models = [c[1]["model"] for c in mock_client.chat.completions.create.call_args_list]
+    assert models == ["small", "large"]
+    assert stats.escalation_rate == 1.0
+    assert stats.tiers["small"].calls == 1
+    assert stats.tiers["large"].calls == 1
+
+
+def test_classify_market_measures_breaker_slo_per_request():
+    now = [0.0]
+    breaker = CircuitBreaker("groq", failure_threshold=1, slo_seconds=10.0, clock=lambda: now[0])
+    responses = iter([
+        '{"worthy": true, "confidence": 0.4}',
+        '{"worthy": true, "confidence": 0.9}',
+    ])
+
+    def slow_create(**kwargs):
+        now[0] += 6.0  # Each request is within the SLO; the cascade as a whole is not
+        return Mock(choices=[Mock(message=Mock(content=next(responses)))])
+
+    with patch("src.llm.Groq") as mock_groq, patch("src.llm.MODEL_CASCADE", ["small", "large"]):
+        mock_groq.return_value.chat.completions.create.side_effect = slow_create
+        worthy = classify_market(
+            question="Will the Fed cut rates?",
+            category="economy",
+            probability=0.73,
+            change=0.22,
+            api_key="test_key",
+            breaker=breaker,
+        )
+
+    assert worthy is True
+    assert breaker.calls == 2
+    assert breaker.slo_breaches == 0
+    assert breaker.state == "closed"
+
+
+def test_rejected_calls_are_not_recorded_as_tier_latency():
+    breaker = CircuitBreaker("groq", failure_threshold=1)
+    stats = JudgeStats()
+
+    with patch("src.llm.Groq") as mock_groq, patch("src.llm.MODEL_CASCADE", ["small"]):
+        mock_groq.return_value.chat.completions.create.side_effect = TimeoutError("groq down")
+        for _ in range(3):
+            with pytest.raises(Exception):
+                classify_market(
+                    question="Will the Fed cut rates?",
+                    category="economy",
+                    probability=0.73,
+                    change=0.22,
+                    api_key="test_key",
+                    stats=stats,
+                    breaker=breaker,
+                )
+
+    # Only the request that reached Groq counts; the open breaker rejected the rest
+    assert mock_groq.return_value.chat.completions.create.call_count == 1
+    assert stats.tiers["small"].calls == 1
+
+
+def test_classify_market_keeps_confident_small_model_verdict():
+    with patch("src.llm.Groq") as mock_groq, patch("src.llm.MODEL_CASCADE", ["small", "large"]):
+        mock_client = _mock_groq_client('{"worthy": false, "confidence": "0.99"}')
+        mock_groq.return_value = mock_client
+        stats = JudgeStats()
+
+        worthy = classify_market(
+            question="Will Elon tweet 100 times?",
+            category="culture",
+            probability=0.50,
+            change=0.05,
+            api_key="test_key",
+            stats=stats,
+        )
+
+    assert worthy is False
+    assert mock_client.chat.completions.create.call_count == 1
+    assert stats.escalations == 0
+
+
+def test_classify_market_uses_last_verdict_when_all_tiers_unsure():
+    with patch("src.llm.Groq") as mock_groq, patch("src.llm.MODEL_CASCADE", ["small", "large"]):
+        mock_groq.return_value = _mock_groq_client(
+            '{"worthy": false, "confidence": 0.3}',
+            '{"worthy": true, "confidence": 0.6}',
+        )
+
+        worthy = classify_market(
+            question="Will the Fed cut rates?",
+            category="economy",
+            probability=0.73,
+            change=0.22,
+            api_key="test_key",
+        )
+
+    assert worthy is True
+
+
+def test_parse_models_strips_names_and_drops_empty_entries():
+    assert _parse_models("small, large,") == ["small", "large"]
+    assert _parse_models(" ,") == []
+
+
+def test_deadline_caps_groq_timeouts_and_stops_new_requests():
+    now = [0.0]
+    deadline = Deadline(seconds=8.0, clock=lambda: now[0])
+    low_confidence = Mock(choices=[Mock(message=Mock(content='{"worthy": true, "confidence": 0.4}'))])
+
+    def expire(**kwargs):
+        now[0] = 9.0  # The deadline passes during the first request
+        return low_confidence
+
+    with patch("src.llm.Groq") as mock_groq, patch("src.llm.MODEL_CASCADE", ["small", "large"]):
+        mock_create = mock_groq.return_value.chat.completions.create
+        mock_create.side_effect = expire
+
+        with pytest.raises(DeadlineExceeded):
+            classify_market(
+                question="Will the Fed cut rates?",
+                category="economy",
+                probability=0.73,
+                change=0.22,
+                api_key="test_key",
+                deadline=deadline,
+            )
+
+    # No escalation after the deadline; the one request and its SDK retry
+    # shared what was left of it
+    assert mock_create.call_count == 1
+    assert mock_create.call_args[1]["timeout"] == 4.0
+
+
+def test_judgment_cache_expires_and_prunes_stale_fields(tmp_path):
+    path = str(tmp_path / "judgments.json")
+    now = [0.0]
+    cache = JudgmentCache(path, clock=lambda: now[0])
+    cache.put("42", worthy=True, summary="Odds jumped to 70%.")
+
+    now[0] = 25 * 3600
+    assert cache.get("42", "summary") is None
+    assert cache.get("42", "worthy") is True
+    cache.save()
+
+    reloaded = JudgmentCache(path, clock=lambda: now[0])
+    assert set(reloaded.entries["42"]) == {"worthy"}
+
+    now[0] = 8 * 24 * 3600
+    reloaded.save()
+    assert JudgmentCache(path).entries == {}
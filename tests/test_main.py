@@ -1,6 +1,24 @@
+import os
+import subprocess
+import sys
+import threading
 from unittest.mock import patch, Mock
 
-from src.main import run
+import pytest
+
+from src.main import _fetch_all_markets, _map_until_deadline, dry_run, main, run, send
+from src.payload import optimize_newsletter
+from src.polymarket import save_snapshot
+from src.resilience import Deadline, RunGuard
+from src.scheduler import DeliveryIncomplete
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_data_dir(tmp_path, monkeypatch):
+    # Snapshots, history and judgments are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
 
 
 def test_run_fetches_all_categories():
@@ -18,11 +36,10 @@ def test_run_fetches_all_categories():
 
     with patch("src.main.fetch_events_by_category", return_value=mock_markets) as mock_fetch:
         with patch("src.main.filter_markets", return_value=mock_markets):
-            with patch("src.main.judge_market") as mock_judge:
-                mock_judge.return_value = Mock(worthy=True, summary="Test summary")
-                with patch("src.main.select_top_markets", return_value=mock_markets):
-                    with patch("src.main.render_newsletter", return_value="<html>"):
-                        with patch("src.main.send_newsletter", return_value=["id1"]):
+            with patch("src.main.classify_market", return_value=True):
+                with patch("src.main.summarize_market", return_value="Test summary"):
+                    with patch("src.main.select_top_markets", return_value=mock_markets):
+                        with patch("src.main.deliver_now", return_value=1):
                             run(
                                 resend_api_key="test",
                                 audience_id="test",
@@ -38,7 +55,7 @@ def test_run_skips_send_when_no_markets():
     with patch("src.main.fetch_events_by_category", return_value=[]):
         with patch("src.main.filter_markets", return_value=[]):
             with patch("src.main.select_top_markets", return_value=[]):
-                with patch("src.main.send_newsletter") as mock_send:
+                with patch("src.main.deliver_now") as mock_send:
                     run(
                         resend_api_key="test",
                         audience_id="test",
@@ -47,3 +64,196 @@ def test_run_skips_send_when_no_markets():
                     )
 
     mock_send.assert_not_called()
+
+
+def test_dry_run_renders_without_judging_or_sending():
+    mock_markets = [
+        {
+            "question": "Test market",
+            "slug": "test",
+            "category": "politics",
+            "outcomePrices": '["0.70", "0.30"]',
+            "oneDayPriceChange": 0.20,
+            "volume24hr": 500000.0,
+            "description": "Resolves Yes if the test passes.",
+        }
+    ]
+
+    with patch("src.main.fetch_events_by_category", return_value=mock_markets):
+        with patch("src.main.classify_market") as mock_classify:
+            with patch("src.main.deliver_now") as mock_send:
+                html = dry_run()
+
+    assert "Test market" in html
+    mock_classify.assert_not_called()
+    mock_send.assert_not_called()
+
+
+def test_importing_main_does_not_load_sdks():
+    code = (
+        "import sys, src.main; "
+        "print(any(m in sys.modules for m in ('groq', 'resend', 'dotenv')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=REPO_ROOT
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_run_summarizes_only_selected_markets():
+    candidates = [
+        {
+            "question": f"Market {i}",
+            "slug": f"m{i}",
+            "category": "politics",
+            "outcomePrices": '["0.70", "0.30"]',
+            "oneDayPriceChange": 0.01 * i,
+            "volume24hr": 500000.0,
+        }
+        for i in range(12)
+    ]
+
+    with patch("src.main.fetch_events_by_category", return_value=[]):
+        with patch("src.main.filter_markets", return_value=candidates):
+            with patch("src.main.classify_market", return_value=True) as mock_classify:
+                with patch("src.main.summarize_market", return_value="Why it matters") as mock_summarize:
+                    with patch("src.main.optimize_newsletter", wraps=optimize_newsletter) as mock_render:
+                        with patch("src.main.deliver_now", return_value=1):
+                            run(
+                                resend_api_key="test",
+                                audience_id="test",
+                                from_email="test@test.com",
+                                groq_api_key="test_groq",
+                            )
+
+    assert mock_classify.call_count == 12
+    assert mock_summarize.call_count == 10
+    # One Groq client for the whole run, shared by both passes
+    clients = {id(c[1]["client"]) for c in mock_classify.call_args_list + mock_summarize.call_args_list}
+    assert len(clients) == 1
+    rendered = mock_render.call_args[0][0]
+    assert all(m["summary"] == "Why it matters" for m in rendered)
+
+
+def test_send_delivers_prepared_issue_without_preparing():
+    issue = Mock(html="<html>", subject="Top Movers", created_at=0.0)
+
+    with patch("src.main.load_fresh_issue", return_value=issue):
+        with patch("src.main.prepare") as mock_prepare:
+            with patch("src.main.deliver_now", return_value=1) as mock_send:
+                send(resend_api_key="test", audience_id="test", from_email="test@test.com")
+
+    mock_prepare.assert_not_called()
+    assert mock_send.call_args[1]["html"] == "<html>"
+    # Paced through the delivery scheduler, resumable under the issue's day
+    assert mock_send.call_args[1]["key"] == "issue-1970-01-01"
+
+
+def test_send_prepares_inline_when_no_fresh_issue():
+    issue = Mock(html="<html>", subject="Top Movers", created_at=0.0)
+
+    with patch("src.main.load_fresh_issue", return_value=None):
+        with patch("src.main.prepare", return_value=issue) as mock_prepare:
+            with patch("src.main.deliver_now", return_value=1) as mock_send:
+                send(
+                    resend_api_key="test",
+                    audience_id="test",
+                    from_email="test@test.com",
+                    groq_api_key="test_groq",
+                )
+
+    mock_prepare.assert_called_once()
+    mock_send.assert_called_once()
+
+
+def test_run_delivers_on_its_own_budget_after_slow_judging():
+    issue = Mock(html="<html>", subject="Top Movers", created_at=0.0)
+
+    def slow_prepare(groq_api_key, cache, guard):
+        # Judging ran into its deadline; sending still has SEND_RESERVE left
+        guard.deadline = Deadline(seconds=0)
+        return issue
+
+    with patch("src.main.prepare", side_effect=slow_prepare):
+        with patch("src.main.deliver_now", return_value=1) as mock_send:
+            run(resend_api_key="test", audience_id="test", from_email="test@test.com", groq_api_key="test_groq")
+
+    assert not mock_send.call_args[1]["deadline"].expired
+
+
+def test_main_exits_non_zero_when_recipients_are_left_unsent(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["src.main", "send"])
+    for name in ("RESEND_API_KEY", "RESEND_AUDIENCE_ID"):
+        monkeypatch.setenv(name, "test")
+
+    with patch("src.main.send", side_effect=DeliveryIncomplete("run deadline exceeded; 3 recipients not sent")):
+        with pytest.raises(SystemExit) as excinfo:
+            main()
+
+    assert "3 recipients not sent" in str(excinfo.value.code)
+
+
+def test_run_falls_back_to_snapshot_and_heuristics_when_upstreams_fail(capsys):
+    market = {
+        "id": "42",
+        "question": "Will the Fed cut rates?",
+        "slug": "fed",
+        "category": "economy",
+        "outcomePrices": '["0.70", "0.30"]',
+        "oneDayPriceChange": 0.20,
+        "volume24hr": 500000.0,
+    }
+    save_snapshot([market])
+
+    with patch("src.main.fetch_events_by_category", side_effect=ConnectionError("gamma down")):
+        with patch("src.main.classify_market", side_effect=TimeoutError("groq down")):
+            with patch("src.main.summarize_market", side_effect=TimeoutError("groq down")):
+                with patch("src.main.deliver_now", return_value=1) as mock_send:
+                    run(
+                        resend_api_key="test",
+                        audience_id="test",
+                        from_email="test@test.com",
+                        groq_api_key="test_groq",
+                    )
+
+    out = capsys.readouterr().out
+    assert "gamma:stale-snapshot" in out
+    assert "groq:heuristic-verdict" in out
+    assert "groq:heuristic-summary" in out
+    assert "Will the Fed cut rates?" in mock_send.call_args[1]["html"]
+
+
+def test_fetch_records_only_live_markets_in_history():
+    live = {"id": "1", "category": "politics", "outcomePrices": '["0.5", "0.5"]'}
+    stale = {"id": "2", "category": "economy", "outcomePrices": '["0.4", "0.6"]'}
+    save_snapshot([stale])
+    recorded = []
+    store = Mock()
+    store.append_markets.side_effect = lambda markets: recorded.append(list(markets))
+
+    def fetch(category, **kwargs):
+        if category == "economy":
+            raise ConnectionError("gamma down")
+        return [live] if category == "politics" else []
+
+    with patch("src.main.fetch_events_by_category", side_effect=fetch):
+        markets = _fetch_all_markets(store, None, RunGuard())
+
+    assert markets == [live, stale]
+    assert recorded == [[live]]
+
+
+def test_map_until_deadline_falls_back_for_unfinished_items():
+    release = threading.Event()
+
+    def judge(item):
+        if item == "slow":
+            release.wait(5)
+        return f"judged {item}"
+
+    try:
+        results = _map_until_deadline(judge, ["fast", "slow"], Deadline(seconds=0.2), lambda item: f"fallback {item}")
+    finally:
+        release.set()
+
+    assert results == ["judged fast", "fallback slow"]
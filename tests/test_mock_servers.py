@@ -0,0 +1,79 @@
+import requests
+from unittest.mock import patch
+
+import pytest
+
+from src.llm import judge_market
+from src.mock_servers import MockConfig, start_mock_servers
+from src.polymarket import fetch_events_by_category
+from src.sender import is_rate_limited, list_recipients, send_email, send_newsletter
+
+
+@pytest.fixture
+def servers():
+    servers = start_mock_servers(num_markets=200, num_recipients=10)
+    yield servers
+    servers.shutdown()
+
+
+def test_gamma_mock_serves_events_by_category(servers):
+    with patch("src.polymarket.GAMMA_API_BASE", servers.env["GAMMA_API_BASE"]):
+        markets = fetch_events_by_category("politics", limit=5)
+
+    assert 0 < len(markets) <= 20
+    assert all(m["category"] == "politics" for m in markets)
+    assert all(m["event_title"].startswith("Mock event") for m in markets)
+
+
+def test_groq_mock_answers_chat_completions(servers):
+    with patch("src.llm.GROQ_BASE_URL", servers.env["GROQ_BASE_URL"]):
+        result = judge_market(
+            question="Will mock outcome 1 happen?",
+            category="politics",
+            probability=0.5,
+            change=0.1,
+            api_key="test_key",
+        )
+
+    assert result.worthy is True
+    assert result.summary
+
+
+def test_resend_mock_lists_contacts_and_accepts_emails(servers):
+    with patch("src.sender.RESEND_API_URL", servers.env["RESEND_API_URL"]):
+        email_ids = send_newsletter(
+            html="<h1>Test</h1>",
+            subject="Test",
+            audience_id="aud-1",
+            from_email="test@example.com",
+            api_key="re_test_key",
+        )
+
+    # Every 50th contact is unsubscribed, starting with the first
+    assert len(email_ids) == 9
+    assert servers.resend.emails_sent == 9
+
+
+def test_mock_rate_limit_returns_429():
+    servers = start_mock_servers(num_markets=10, num_recipients=1, config=MockConfig(rate_limit=1))
+    try:
+        url = f"{servers.env['GAMMA_API_BASE']}/markets"
+        statuses = [requests.get(url).status_code for _ in range(3)]
+    finally:
+        servers.shutdown()
+
+    assert 429 in statuses
+
+
+def test_resend_mock_rate_limit_raises_through_sdk():
+    servers = start_mock_servers(num_markets=10, num_recipients=1, config=MockConfig(rate_limit=1))
+    try:
+        with patch("src.sender.RESEND_API_URL", servers.env["RESEND_API_URL"]):
+            list_recipients("aud-1", "re_test_key")
+            with pytest.raises(Exception) as excinfo:
+                for _ in range(3):
+                    send_email("<h1>Test</h1>", "Test", "test@example.com", "user0@example.com")
+    finally:
+        servers.shutdown()
+
+    assert is_rate_limited(excinfo.value)
@@ -0,0 +1,65 @@
+from src.email_template import render_newsletter
+from src.payload import dedupe_styles, minify_html, optimize_newsletter
+
+
+def _market(i, summary="A summary sentence that explains why the odds moved. " * 4):
+    return {
+        "question": f"Will event {i} happen?",
+        "slug": f"event-{i}",
+        "outcomePrices": ["0.60", "0.40"],
+        "oneDayPriceChange": 0.12,
+        "volume24hr": 500000.0,
+        "summary": summary,
+    }
+
+
+def test_minify_html_strips_whitespace_and_comments_but_keeps_content():
+    html = render_newsletter([_market(1)], date_str="Feb 3, 2026")
+
+    minified = minify_html(html)
+
+    assert len(minified) < len(html)
+    assert "<!-- Header -->" not in minified
+    assert ">\n" not in minified
+    assert "Will event 1 happen?" in minified
+    assert "{{{RESEND_UNSUBSCRIBE_URL}}}" in minified
+    assert 'style="font-size:16px;font-weight:bold;color:#111827;margin-bottom:6px"' in minified
+
+
+def test_dedupe_styles_moves_repeated_styles_into_classes():
+    html = '<html><head></head><body><p style="color:#111827;font-size:16px">a</p><p style="color:#111827;font-size:16px">b</p><p style="color:red">c</p></body></html>'
+
+    deduped = dedupe_styles(html)
+
+    assert "<style>.s0{color:#111827;font-size:16px}</style></head>" in deduped
+    assert deduped.count('class="s0"') == 2
+    assert 'style="color:red"' in deduped
+
+
+def test_optimize_newsletter_only_minifies_when_under_budget():
+    payload = optimize_newsletter([_market(i) for i in range(10)], date_str="Feb 3, 2026")
+
+    assert payload.steps == ["minify"]
+    assert len(payload.markets) == 10
+    assert "<style>" not in payload.html
+
+
+def test_optimize_newsletter_shortens_summaries_when_over_budget():
+    markets = [_market(i, summary="word " * 400) for i in range(10)]
+    full_size = len(minify_html(render_newsletter(markets, date_str="Feb 3, 2026")).encode())
+
+    payload = optimize_newsletter(markets, date_str="Feb 3, 2026", budget=full_size // 3)
+
+    assert payload.size <= full_size // 3
+    assert "dedupe-styles" in payload.steps
+    assert "summaries<=240" in payload.steps
+    # Caller's markets aren't modified
+    assert markets[0]["summary"] == "word " * 400
+    assert all(len(m["summary"]) <= 240 for m in payload.markets)
+
+
+def test_optimize_newsletter_keeps_at_least_one_row():
+    payload = optimize_newsletter([_market(1), _market(2)], date_str="Feb 3, 2026", budget=10)
+
+    assert len(payload.markets) == 1
+    assert payload.steps[-1] == "drop-row"
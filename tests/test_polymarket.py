@@ -1,5 +1,6 @@
 import json
 from unittest.mock import patch, MagicMock, Mock
+from src.http_cache import HTTPCache
 from src.polymarket import fetch_active_markets, fetch_events_by_category, CATEGORY_TAGS
 
 SAMPLE_MARKETS_RESPONSE = [
@@ -109,3 +110,17 @@ def test_category_tags_exist():
     assert CATEGORY_TAGS["sports"] == 1
     assert CATEGORY_TAGS["science_tech"] == 1401
     assert CATEGORY_TAGS["culture"] == 596
+
+
+def test_fetch_events_by_category_reads_through_cache(tmp_path):
+    response = Mock(status_code=200, headers={"ETag": '"v1"'})
+    response.json.return_value = [{"title": "Event", "markets": [{"question": "Cached?"}]}]
+    cache = HTTPCache(root=str(tmp_path), max_age=300)
+
+    with patch("src.polymarket.requests.get", return_value=response) as mock_get:
+        fetch_events_by_category("economy", limit=10, cache=cache)
+        result = fetch_events_by_category("economy", limit=10, cache=cache)
+
+    mock_get.assert_called_once()
+    assert result[0]["question"] == "Cached?"
+    assert result[0]["category"] == "economy"
@@ -0,0 +1,52 @@
+import threading
+
+from src.profiler import SamplingProfiler, set_stage
+
+
+def _busy(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_samples_are_tagged_with_the_current_stage():
+    profiler = SamplingProfiler(interval=0.001)
+
+    set_stage("fetch")  # No-op while nothing is profiling
+    with profiler:
+        set_stage("filter")
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy, args=(stop,))
+        worker.start()
+        for _ in range(20):
+            profiler.sample()
+        stop.set()
+        worker.join()
+
+    assert "filter" in profiler.stages()
+    assert "fetch" not in profiler.stages()
+    functions = [label for label, _, _ in profiler.hot_functions()]
+    assert any(label.startswith("_busy (test_profiler.py") for label in functions)
+
+
+def test_collapsed_output_is_flamegraph_format(tmp_path):
+    profiler = SamplingProfiler()
+    profiler.samples[("filter", ("main (main.py:1)", "filter_markets (ranker.py:16)"))] = 3
+    profiler.samples[("render", ("main (main.py:1)", "render_newsletter (email_template.py:86)"))] = 1
+
+    assert profiler.collapsed("filter") == "main (main.py:1);filter_markets (ranker.py:16) 3\n"
+    assert "render;main (main.py:1);render_newsletter (email_template.py:86) 1" in profiler.collapsed()
+
+    paths = profiler.write_collapsed(str(tmp_path))
+    assert sorted(p.rsplit("/", 1)[1] for p in paths) == ["all.folded", "filter.folded", "render.folded"]
+
+
+def test_hot_functions_split_self_and_total_samples():
+    profiler = SamplingProfiler()
+    profiler.samples[("filter", ("main", "filter_markets", "is_blocklisted"))] = 6
+    profiler.samples[("filter", ("main", "filter_markets"))] = 2
+
+    hot = profiler.hot_functions()
+
+    assert hot[0] == ("is_blocklisted", 6, 6)
+    assert ("filter_markets", 2, 8) in hot
+    assert "Top 20 functions" in profiler.format_report()
@@ -97,3 +97,28 @@ def test_select_top_markets_ranks_by_price_change():
     questions = [m["question"] for m in result]
     assert questions[0] == "Politics High"
     assert questions[1] == "Politics Mid"
+
+
+def test_select_top_markets_prefers_mover_score_when_annotated():
+    markets = [
+        {"question": "Big daily move", "category": "politics", "oneDayPriceChange": 0.30, "mover_score": 1.0},
+        {"question": "Sharp hourly move", "category": "politics", "oneDayPriceChange": 0.05, "mover_score": 6.0},
+    ]
+
+    result = select_top_markets(markets, target_total=1)
+
+    assert result[0]["question"] == "Sharp hourly move"
+
+
+def test_select_top_markets_spreads_picks_across_stories():
+    markets = [
+        {"question": "Will Trump win Pennsylvania in the 2028 presidential election?", "event_title": "Presidential Election Winner by State", "category": "politics", "oneDayPriceChange": 0.30},
+        {"question": "Will Trump win Michigan in the 2028 presidential election?", "event_title": "Presidential Election Winner by State", "category": "politics", "oneDayPriceChange": 0.29},
+        {"question": "Will the Senate pass the budget bill?", "event_title": "Budget Bill", "category": "politics", "oneDayPriceChange": 0.10},
+    ]
+
+    diverse = [m["question"] for m in select_top_markets(markets, target_total=2)]
+    plain = [m["question"] for m in select_top_markets(markets, target_total=2, diversity=0)]
+
+    assert "Will the Senate pass the budget bill?" in diverse
+    assert "Will the Senate pass the budget bill?" not in plain
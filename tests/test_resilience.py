@@ -0,0 +1,113 @@
+import pytest
+
+from src.resilience import SEND_RESERVE, CircuitBreaker, CircuitOpenError, Deadline, DeadlineExceeded, RunGuard, RunReport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail():
+    raise ConnectionError("down")
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("gamma", failure_threshold=2, clock=FakeClock())
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(_fail)
+
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "never called")
+
+
+def test_breaker_counts_slo_breaches_as_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker("groq", failure_threshold=1, slo_seconds=1.0, clock=clock)
+
+    def slow():
+        clock.now += 2.0
+        return "late"
+
+    assert breaker.call(slow) == "late"
+    assert breaker.slo_breaches == 1
+    assert breaker.state == "open"
+
+
+def test_breaker_half_opens_and_closes_on_success():
+    clock = FakeClock()
+    breaker = CircuitBreaker("gamma", failure_threshold=1, reset_timeout=30, clock=clock)
+    with pytest.raises(ConnectionError):
+        breaker.call(_fail)
+
+    clock.now += 31
+    assert breaker.state == "half-open"
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+def test_breaker_reopens_when_half_open_trial_fails():
+    clock = FakeClock()
+    breaker = CircuitBreaker("gamma", failure_threshold=3, reset_timeout=30, clock=clock)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            breaker.call(_fail)
+
+    clock.now += 31
+    with pytest.raises(ConnectionError):
+        breaker.call(_fail)
+    assert breaker.state == "open"
+
+
+def test_deadline_caps_request_timeouts():
+    clock = FakeClock()
+    deadline = Deadline(seconds=5, clock=clock)
+
+    assert deadline.timeout(10) == 5
+    assert deadline.timeout(10, attempts=2) == 2.5
+    clock.now = 6
+    assert deadline.expired
+    assert deadline.timeout(10) == 0.1
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+
+
+def test_run_guard_keeps_time_back_for_sending():
+    guard = RunGuard()
+
+    # Judging stops SEND_RESERVE before the run ends, whatever it ran into
+    assert guard.send_deadline.remaining() - guard.deadline.remaining() == pytest.approx(SEND_RESERVE, abs=1.0)
+
+
+def test_run_report_lists_degraded_modes():
+    report = RunReport()
+    assert "healthy" in str(report)
+
+    report.note("groq:heuristic-summary")
+    report.note("groq:heuristic-summary")
+
+    assert str(report) == "Run report: DEGRADED (groq:heuristic-summary x2)"
+
+
+def test_half_open_breaker_admits_a_single_trial_call():
+    clock = FakeClock()
+    breaker = CircuitBreaker("groq", failure_threshold=1, reset_timeout=30, clock=clock)
+    with pytest.raises(ConnectionError):
+        breaker.call(_fail)
+    clock.now += 31
+
+    def concurrent_caller():
+        # A second caller arriving while the trial is still running
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "never called")
+        return "trial"
+
+    assert breaker.call(concurrent_caller) == "trial"
+    assert breaker.state == "closed"
+    assert breaker.call(lambda: "ok") == "ok"
@@ -0,0 +1,228 @@
+import json
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from src.issue import Issue
+from src.resilience import Deadline
+from src.scheduler import DeliveryIncomplete, DeliveryScheduler, SendWindow, deliver_now, deliver_scheduled, plan_windows
+
+
+def _utc(hour):
+    return datetime(2026, 10, 19, hour, tzinfo=timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_plan_windows_buckets_by_timezone_at_local_hour():
+    windows = plan_windows(
+        ["ny@example.com", "la@example.com", "LDN@example.com", "nobody@example.com"],
+        {"la@example.com": "America/Los_Angeles", "ldn@example.com": "Europe/London"},
+        _utc(0),
+    )
+
+    assert [w.timezone for w in windows] == ["Europe/London", "America/New_York", "America/Los_Angeles"]
+    assert windows[0].due == _utc(6)  # 07:00 BST
+    assert windows[1].due == _utc(11)  # 07:00 EDT
+    assert windows[1].recipients == ["ny@example.com", "nobody@example.com"]
+
+
+def test_plan_windows_falls_back_on_unknown_timezone():
+    windows = plan_windows(["a@example.com"], {"a@example.com": "Mars/Olympus"}, _utc(0))
+
+    assert windows[0].timezone == "America/New_York"
+
+
+def test_plan_windows_rolls_past_mornings_to_the_next_day():
+    windows = plan_windows(
+        ["ny@example.com", "tokyo@example.com"],
+        {"tokyo@example.com": "Asia/Tokyo"},
+        _utc(11),
+    )
+
+    assert windows[0].timezone == "America/New_York"
+    assert windows[0].due == _utc(11)  # 07:00 EDT is exactly when the issue is ready
+    # 07:00 JST was 13h ago, past the grace period
+    assert windows[1].due == _utc(22)
+    assert windows[1].key == "2026-10-20:Asia/Tokyo"
+
+
+def test_plan_windows_sends_mornings_within_the_grace_period_now():
+    ready = datetime(2026, 7, 1, 11, 4, tzinfo=timezone.utc).timestamp()
+    windows = plan_windows(
+        ["ny@example.com", "ldn@example.com"],
+        {"ldn@example.com": "Europe/London"},
+        ready,
+    )
+
+    # 07:00 EDT was 4 minutes ago and 07:00 BST 5h ago: both go out now, not
+    # a day late
+    assert [w.key for w in windows] == ["2026-07-01:Europe/London", "2026-07-01:America/New_York"]
+    assert all(w.due <= ready for w in windows)
+
+
+def test_deliver_scheduled_sends_tokyo_the_next_local_morning():
+    issue = Issue(date_str="Oct 19, 2026", subject="Top Movers", html="<p>", markets=[], created_at=_utc(11))
+
+    with patch("src.scheduler.list_recipients", return_value=["tokyo@example.com"]), \
+         patch("src.scheduler.load_timezones", return_value={"tokyo@example.com": "Asia/Tokyo"}), \
+         patch("src.scheduler.SuppressionIndex.load") as mock_suppression, \
+         patch("src.scheduler.DeliveryScheduler") as mock_scheduler:
+        mock_suppression.return_value.filter.side_effect = lambda r: (r, 0)
+        deliver_scheduled(issue, "re_key", "aud-1", "news@example.com")
+
+    [window] = mock_scheduler.call_args[0][0]
+    # 07:00 JST on Oct 20 is 22:00 UTC on Oct 19, not an immediate send at 20:00 JST
+    assert window.due == _utc(22)
+    assert window.key == "2026-10-20:Asia/Tokyo"
+
+
+def test_deliver_now_can_drop_progress_once_complete(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.scheduler.DELIVERY_STATE_DIR", str(tmp_path))
+
+    with patch("src.scheduler._deliverable_recipients", return_value=["a@example.com"]), \
+         patch("src.scheduler.send_email") as mock_send:
+        sent = deliver_now("alert-1-0", "<p>", "Breaking", "re_key", "aud-1", "news@example.com", keep_progress=False)
+
+    assert sent == 1
+    mock_send.assert_called_once()
+    assert not (tmp_path / "alert-1-0.json").exists()
+
+
+def test_drain_sends_in_due_order_under_rate_limit(tmp_path):
+    clock = FakeClock(_utc(0))
+    windows = [
+        SendWindow(due=_utc(11), key="ny", timezone="America/New_York", recipients=["c", "d"]),
+        SendWindow(due=_utc(6), key="ldn", timezone="Europe/London", recipients=["a", "b"]),
+    ]
+    sent_at = []
+    scheduler = DeliveryScheduler(windows, str(tmp_path / "state.json"), rate=2, clock=clock.time, sleep=clock.sleep)
+
+    total = scheduler.drain(lambda r: sent_at.append((r, clock.now)))
+
+    assert total == 4
+    assert [r for r, _ in sent_at] == ["a", "b", "c", "d"]
+    assert sent_at[0][1] == _utc(6)
+    assert sent_at[1][1] - sent_at[0][1] == 0.5
+
+
+def test_drain_resumes_from_persisted_progress(tmp_path):
+    state_path = str(tmp_path / "state.json")
+    window = SendWindow(due=0, key="ny", timezone="America/New_York", recipients=["a", "b", "c"])
+
+    def fail_on_c(recipient):
+        if recipient == "c":
+            raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        DeliveryScheduler([window], state_path, rate=1000).drain(fail_on_c)
+
+    sent = []
+    DeliveryScheduler([window], state_path, rate=1000).drain(sent.append)
+
+    assert sent == ["c"]
+
+
+def test_drain_backs_off_and_retries_on_429(tmp_path):
+    clock = FakeClock(0)
+    window = SendWindow(due=0, key="ny", timezone="America/New_York", recipients=["a"])
+    attempts = []
+
+    def rate_limited_once(recipient):
+        attempts.append(clock.now)
+        if len(attempts) == 1:
+            error = Exception("rate limited")
+            error.code = 429
+            raise error
+
+    DeliveryScheduler([window], str(tmp_path / "s.json"), rate=10, clock=clock.time, sleep=clock.sleep).drain(rate_limited_once)
+
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 5.0
+
+
+def _rate_limit_error(error_type="rate_limit_exceeded", headers=None):
+    error = Exception(error_type)
+    error.code = 429
+    error.error_type = error_type
+    error.headers = headers
+    return error
+
+
+def test_drain_honours_retry_after_and_gives_up_on_persistent_429s(tmp_path):
+    clock = FakeClock(0)
+    window = SendWindow(due=0, key="ny", timezone="America/New_York", recipients=["a", "b"])
+    attempts = []
+
+    def always_limited(recipient):
+        attempts.append(clock.now)
+        raise _rate_limit_error(headers={"Retry-After": "30"})
+
+    scheduler = DeliveryScheduler([window], str(tmp_path / "s.json"), rate=10, clock=clock.time, sleep=clock.sleep)
+    with pytest.raises(DeliveryIncomplete, match="2 recipients not sent"):
+        scheduler.drain(always_limited)
+
+    assert len(attempts) == 6  # The first try plus MAX_RATE_LIMIT_RETRIES
+    assert all(b - a >= 30 for a, b in zip(attempts, attempts[1:]))
+
+
+def test_drain_stops_and_checkpoints_when_quota_is_exhausted(tmp_path):
+    state = tmp_path / "s.json"
+    windows = [
+        SendWindow(due=0, key="ldn", timezone="Europe/London", recipients=["a", "b"]),
+        SendWindow(due=10, key="ny", timezone="America/New_York", recipients=["c"]),
+    ]
+    sent = []
+
+    def quota_after_one(recipient):
+        if sent:
+            raise _rate_limit_error("daily_quota_exceeded")
+        sent.append(recipient)
+
+    clock = FakeClock(0)
+    scheduler = DeliveryScheduler(windows, str(state), rate=10, clock=clock.time, sleep=clock.sleep)
+    with pytest.raises(DeliveryIncomplete, match="quota exhausted.*2 recipients not sent"):
+        scheduler.drain(quota_after_one)
+
+    assert sent == ["a"]
+    assert json.loads(state.read_text()) == {"ldn": ["a"]}
+
+
+def test_drain_rereads_progress_another_worker_saved(tmp_path):
+    state = tmp_path / "s.json"
+    window = SendWindow(due=0, key="ny", timezone="America/New_York", recipients=["a", "b"])
+    clock = FakeClock(0)
+    scheduler = DeliveryScheduler([window], str(state), rate=10, clock=clock.time, sleep=clock.sleep)
+    # Another worker finished "a" after this one was constructed
+    state.write_text(json.dumps({"ny": ["a"]}))
+    sent = []
+
+    assert scheduler.drain(sent.append) == 1
+    assert sent == ["b"]
+    assert (tmp_path / "send.lock").exists()
+
+
+def test_drain_stops_at_the_deadline_with_progress_saved(tmp_path):
+    state = tmp_path / "s.json"
+    clock = FakeClock(0)
+    window = SendWindow(due=0, key="issue", timezone="UTC", recipients=["a", "b", "c"])
+    scheduler = DeliveryScheduler([window], str(state), rate=1, clock=clock.time, sleep=clock.sleep)
+    sent = []
+
+    with pytest.raises(DeliveryIncomplete, match="deadline.*1 recipients not sent"):
+        scheduler.drain(sent.append, Deadline(seconds=1.5, clock=clock.time))
+
+    assert sent == ["a", "b"]
+    assert json.loads(state.read_text()) == {"issue": ["a", "b"]}
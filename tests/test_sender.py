@@ -1,5 +1,6 @@
 from unittest.mock import patch, MagicMock
 from src.sender import send_newsletter
+from src.suppression import SuppressionIndex
 
 
 @patch("src.sender.resend")
@@ -60,3 +61,29 @@ def test_send_newsletter_sets_api_key(mock_resend):
     )
 
     assert mock_resend.api_key == "re_my_key"
+
+
+@patch("src.sender.resend")
+def test_send_newsletter_skips_suppressed(mock_resend):
+    mock_resend.Contacts.list.return_value = {
+        "data": [
+            {"email": "user1@example.com", "unsubscribed": False},
+            {"email": "bounced@example.com", "unsubscribed": False},
+        ]
+    }
+    mock_resend.Emails.send.return_value = {"id": "email-123"}
+    suppression = SuppressionIndex()
+    suppression.add("bounced@example.com")
+
+    result = send_newsletter(
+        html="<h1>Test</h1>",
+        subject="Test",
+        audience_id="aud-1",
+        from_email="test@example.com",
+        api_key="re_my_key",
+        suppression=suppression,
+    )
+
+    assert len(result) == 1
+    assert mock_resend.Emails.send.call_args[0][0]["to"] == ["user1@example.com"]
+
@@ -0,0 +1,76 @@
+import pytest
+
+from src.suppression import SuppressionIndex, ingest_events
+
+
+def test_index_matches_normalised_addresses():
+    index = SuppressionIndex()
+    index.add("  User@Example.com ")
+
+    assert "user@example.com" in index
+    assert "other@example.com" not in index
+
+
+def test_index_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / "suppression.bin")
+    index = SuppressionIndex(key="secret")
+    index.add("a@example.com")
+    index.add("b@example.com")
+    index.save(path)
+
+    loaded = SuppressionIndex.load(path, key="secret")
+
+    assert len(loaded) == 2
+    assert "a@example.com" in loaded
+    assert "c@example.com" not in loaded
+    # Key check plus one 8-byte hash per address
+    assert (tmp_path / "suppression.bin").stat().st_size == 24
+
+
+def test_hashes_depend_on_the_key(tmp_path):
+    path = str(tmp_path / "suppression.bin")
+    index = SuppressionIndex(key="secret")
+    index.add("a@example.com")
+    index.save(path)
+
+    other = SuppressionIndex(key="other")
+    other.add("a@example.com")
+    assert other.hashes.isdisjoint(index.hashes)
+    with pytest.raises(ValueError, match="SUPPRESSION_KEY"):
+        SuppressionIndex.load(path, key="")
+    with pytest.raises(ValueError, match="SUPPRESSION_KEY"):
+        SuppressionIndex(key="").save(path)
+
+
+def test_missing_file_loads_empty_index(tmp_path):
+    assert len(SuppressionIndex.load(str(tmp_path / "missing.bin"))) == 0
+
+
+def test_ingest_events_suppresses_hard_bounces_complaints_and_unsubscribes():
+    events = [
+        {"type": "email.bounced", "data": {"to": ["hard@example.com"], "bounce": {"type": "Permanent"}}},
+        {"type": "email.bounced", "data": {"to": ["soft@example.com"], "bounce": {"type": "Transient"}}},
+        {"type": "email.complained", "data": {"to": ["spam@example.com"]}},
+        {"type": "contact.updated", "data": {"email": "gone@example.com", "unsubscribed": True}},
+        {"type": "email.delivered", "data": {"to": ["fine@example.com"]}},
+    ]
+    index = SuppressionIndex()
+
+    added = ingest_events(index, events)
+
+    assert added == 3
+    assert "hard@example.com" in index
+    assert "soft@example.com" not in index
+    assert "spam@example.com" in index
+    assert "gone@example.com" in index
+    assert "fine@example.com" not in index
+
+
+def test_filter_reports_skipped_count():
+    index = SuppressionIndex()
+    index.add("b@example.com")
+
+    kept, skipped = index.filter(["a@example.com", "b@example.com"])
+
+    assert kept == ["a@example.com"]
+    assert skipped == 1